@@ -6,7 +6,6 @@ import signal
 import time
 from pathlib import Path
 from typing import Optional
-from datetime import datetime
 
 # Global flag for graceful shutdown in worker process
 _shutdown_requested = False
@@ -18,21 +17,50 @@ class BackgroundIndexer:
     def __init__(self):
         """Initialize the background indexer."""
         self.process: Optional[multiprocessing.Process] = None
-        self.status_queue = multiprocessing.Queue()
-        self.start_time: Optional[datetime] = None
+        # One-way pipe for status updates: child sends, parent drains with
+        # poll()/recv() - no empty()/get_nowait() race and no polling cost
+        self._parent_conn, self._child_conn = multiprocessing.Pipe(duplex=False)
+        # One-way pipe for submitting jobs to the persistent worker; a None
+        # sentinel tells the worker to exit
+        self._job_recv, self._job_send = multiprocessing.Pipe(duplex=False)
+        # Set by the parent on submit, cleared by the worker when the job
+        # finishes; is_running() reads it without any pipe round-trip
+        self._busy = multiprocessing.Event()
+        # Set by the worker when a job finishes (success or not), so
+        # callers can done.wait(timeout) instead of polling is_running()
+        self.done = multiprocessing.Event()
+        # Monotonic timestamp; immune to wall-clock jumps and cheap to read
+        self.start_time: Optional[float] = None
 
     @staticmethod
-    def _index_worker(path: str, db_path: str, status_queue: multiprocessing.Queue):
+    def _worker_loop(job_conn, status_conn, busy, done):
         """
-        Worker function that runs in a separate process to index books.
+        Persistent worker process: run indexing jobs until told to exit.
+
+        Keeping one long-lived process avoids paying process startup and
+        module imports for every `start_indexing` call. Jobs arrive as
+        (path, db_path, batch_size) tuples; a None sentinel shuts the
+        worker down.
 
         Args:
-            path: Path to the file or directory to index
-            db_path: Path to the database
-            status_queue: Queue for sending status updates
+            job_conn: Pipe connection jobs are received on
+            status_conn: Pipe connection for sending status updates
+            busy: Event cleared when the current job finishes
+            done: Event set when the current job finishes
         """
         global _shutdown_requested
 
+        # On fork platforms the worker inherits the parent's open shared
+        # databases. Reusing one would bypass the lock, and closing one
+        # (the destructor or our atexit hook would) unlocks the lock fd
+        # shared with the parent, releasing its "exclusive" lock. Detach
+        # them so they are inert, then drop the references; jobs get
+        # fresh, properly locked instances from get_database()
+        import database
+        for db in database._shared_instances.values():
+            db.detach()
+        database._shared_instances.clear()
+
         def signal_handler(signum, frame):
             """Handle shutdown signals gracefully."""
             global _shutdown_requested
@@ -42,54 +70,110 @@ class BackgroundIndexer:
         signal.signal(signal.SIGTERM, signal_handler)
         signal.signal(signal.SIGINT, signal_handler)
 
+        while True:
+            try:
+                job = job_conn.recv()
+            except (EOFError, OSError):
+                break
+            if job is None:
+                break
+
+            _shutdown_requested = False
+            try:
+                BackgroundIndexer._run_job(job[0], job[1], job[2], status_conn)
+            finally:
+                busy.clear()
+                done.set()
+
+            if _shutdown_requested:
+                break
+
+    @staticmethod
+    def _run_job(path: str, db_path: str, batch_size, status_conn):
+        """
+        Index a single file or directory inside the worker process.
+
+        The BookIndexer (and its database lock) lives only for the
+        duration of the job, so an idle worker never blocks the main
+        process from opening the database.
+
+        Args:
+            path: Path to the file or directory to index
+            db_path: Path to the database
+            batch_size: Chunks per database insert batch, or None for
+                the default
+            status_conn: Pipe connection for sending status updates
+        """
         try:
             # Import here to avoid issues with multiprocessing
             from indexer import BookIndexer
-            from pathlib import Path
 
-            status_queue.put({"status": "starting", "message": "Initializing indexer..."})
+            status_conn.send({"status": "starting", "message": "Initializing indexer..."})
 
-            indexer = BookIndexer(db_path)
+            indexer = BookIndexer(db_path, batch_size=batch_size)
 
             try:
                 path_obj = Path(path)
                 if path_obj.is_dir():
-                    status_queue.put({"status": "running", "message": f"Indexing directory: {path}"})
-                    stats = indexer.index_directory(path, interrupt_check=lambda: _shutdown_requested)
+                    status_conn.send({"status": "running", "message": f"Indexing directory: {path}"})
+                    # The indexer's own pipeline already parallelizes
+                    # extraction and, unlike a bespoke loop here, applies
+                    # content-hash dedup and batch-duplicate aliasing
+                    stats = indexer.index_directory(
+                        path,
+                        interrupt_check=lambda: _shutdown_requested,
+                        progress_callback=lambda done, total: status_conn.send({
+                            "status": "running",
+                            "message": f"Indexed {done}/{total} book(s)"
+                        })
+                    )
                 else:
-                    status_queue.put({"status": "running", "message": f"Indexing file: {path}"})
+                    status_conn.send({"status": "running", "message": f"Indexing file: {path}"})
                     success = indexer.index_file(path)
                     stats = {'success': 1 if success else 0, 'failed': 0 if success else 1}
 
                 if _shutdown_requested:
-                    status_queue.put({
+                    status_conn.send({
                         "status": "interrupted",
                         "message": "Indexing interrupted - progress saved",
                         "stats": stats
                     })
                 else:
-                    status_queue.put({
+                    status_conn.send({
                         "status": "completed",
                         "message": "Indexing completed successfully!",
                         "stats": stats
                     })
             finally:
-                indexer.close()
+                # The indexer uses the shared per-path database, which
+                # indexer.close() only flushes. The worker outlives the
+                # job, so evict the instance explicitly - releasing the
+                # file lock - or the main process blocks on its first
+                # database open. The inner finally keeps the eviction on
+                # the path even when the final flush raises.
+                try:
+                    indexer.close()
+                finally:
+                    from database import close_database
+                    close_database(db_path)
 
         except Exception as e:
-            status_queue.put({
+            status_conn.send({
                 "status": "error",
                 "message": f"Indexing failed: {str(e)}",
                 "error": str(e)
             })
 
-    def start_indexing(self, path: str, db_path: str = "./chroma_db") -> bool:
+    def start_indexing(self, path: str, db_path: str = "./chroma_db",
+                       batch_size: int = None) -> bool:
         """
         Start background indexing of a file or directory.
 
         Args:
             path: Path to the file or directory to index
             db_path: Path to the database
+            batch_size: Chunks per database insert batch (50-250), or
+                None for the default
 
         Returns:
             True if indexing started successfully, False otherwise
@@ -97,21 +181,28 @@ class BackgroundIndexer:
         if self.is_running():
             return False
 
-        # Clear old status messages
-        while not self.status_queue.empty():
-            try:
-                self.status_queue.get_nowait()
-            except:
-                break
+        # Drain stale status messages from any previous run
+        self.get_all_status_updates()
 
-        # Start the indexing process
+        # Start (or reuse) the persistent worker, then hand it the job.
+        # The busy flag is set before sending so a second call cannot
+        # sneak in while the worker is still picking the job up.
+        self._ensure_worker()
+        self.done.clear()
+        self._busy.set()
+        self._job_send.send((path, db_path, batch_size))
+        self.start_time = time.monotonic()
+        return True
+
+    def _ensure_worker(self):
+        """Start the persistent worker process if it is not alive."""
+        if self.process is not None and self.process.is_alive():
+            return
         self.process = multiprocessing.Process(
-            target=self._index_worker,
-            args=(path, db_path, self.status_queue)
+            target=self._worker_loop,
+            args=(self._job_recv, self._child_conn, self._busy, self.done)
         )
         self.process.start()
-        self.start_time = datetime.now()
-        return True
 
     def is_running(self) -> bool:
         """
@@ -122,7 +213,7 @@ class BackgroundIndexer:
         """
         if self.process is None:
             return False
-        return self.process.is_alive()
+        return self.process.is_alive() and self._busy.is_set()
 
     def get_status(self) -> Optional[dict]:
         """
@@ -132,9 +223,9 @@ class BackgroundIndexer:
             Status dictionary or None if no updates available
         """
         try:
-            if not self.status_queue.empty():
-                return self.status_queue.get_nowait()
-        except:
+            if self._parent_conn.poll(0):
+                return self._parent_conn.recv()
+        except (EOFError, OSError):
             pass
         return None
 
@@ -163,8 +254,7 @@ class BackgroundIndexer:
         if self.start_time is None:
             return None
 
-        elapsed = datetime.now() - self.start_time
-        seconds = int(elapsed.total_seconds())
+        seconds = int(time.monotonic() - self.start_time)
         if seconds < 60:
             return f"{seconds}s"
         minutes = seconds // 60
@@ -172,7 +262,7 @@ class BackgroundIndexer:
         return f"{minutes}m {seconds}s"
 
     def stop(self):
-        """Stop the background indexing process gracefully."""
+        """Stop the background worker process gracefully."""
         if self.process and self.process.is_alive():
             # Send SIGTERM for graceful shutdown
             self.process.terminate()
@@ -184,7 +274,18 @@ class BackgroundIndexer:
                 self.process.join(timeout=1)
         self.process = None
         self.start_time = None
+        self._busy.clear()
+        # Release anyone blocked in done.wait(); the job will not finish
+        self.done.set()
 
     def cleanup(self):
-        """Clean up resources."""
+        """Clean up resources, letting an idle worker exit on its own."""
+        if self.process and self.process.is_alive() and not self._busy.is_set():
+            # Idle worker: ask it to exit via the sentinel instead of
+            # signalling, then fall back to stop() if it doesn't
+            try:
+                self._job_send.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=5)
         self.stop()
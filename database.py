@@ -1,28 +1,82 @@
 """
 Database manager for book content using ChromaDB with semantic search.
 """
+import atexit
+import bisect
 import chromadb
+import os
+import numpy as np
 from chromadb.config import Settings
 from pathlib import Path
 from typing import List, Dict, Optional
-import hashlib
+from blake3 import blake3
+import pickle
+import re
+import sqlite3
 from db_lock import DatabaseLock
 
 
+# Model used for both chunk and query embeddings
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Lighter 3-layer model for --fast mode: roughly half the encode latency
+# on CPU for a few points of retrieval quality. Queries must be encoded
+# by the same model that indexed the collection, so this applies to both
+# sides, not just queries.
+FAST_EMBEDDING_MODEL = "paraphrase-MiniLM-L3-v2"
+
+# Texts per model forward pass inside encode(); bounds peak activation
+# memory while keeping the GPU/BLAS kernels saturated
+ENCODE_BATCH_SIZE = 64
+
+# Sentence boundaries used to split chunks at natural break points
+_SENTENCE_RE = re.compile(r'[.?!] ')
+
+# Chunk IDs look like "<book_id>_chunk_<n>"
+_CHUNK_ID_RE = re.compile(r'^(.+)_chunk_\d+$')
+
+# Tokenizer for the BM25 sparse index
+_TOKEN_RE = re.compile(r'\w+')
+
+# Reciprocal-rank-fusion constant (standard value from the RRF paper)
+_RRF_K = 60
+
+# Collections up to this many chunks use an exact in-memory FAISS index
+# for the dense search leg; larger ones stay on ChromaDB's HNSW
+_FAISS_MAX_CHUNKS = 100_000
+
+
 class BookDatabase:
     """Manages book content storage and retrieval using ChromaDB."""
 
-    def __init__(self, db_path: str = "./chroma_db", verbose: bool = True):
+    def __init__(self, db_path: str = "./chroma_db", verbose: bool = True,
+                 quantize=False, model_name: str = EMBEDDING_MODEL):
         """
         Initialize the database.
 
         Args:
             db_path: Path to store the ChromaDB database
             verbose: Whether to print status messages
+            quantize: Scalar-quantize the in-process FAISS mirror:
+                'int8' (or True) stores 8-bit codes, 4x less vector
+                memory during search at a small recall cost; 'fp16'
+                stores half-precision, 2x less with no measurable loss.
+                ChromaDB itself persists raw fp32 regardless, so the
+                stored embeddings are never rounded.
+            model_name: Sentence-transformers model for chunk and query
+                embeddings. Must match the model the collection was
+                indexed with; vectors from different models do not live
+                in the same space.
         """
         self.db_path = Path(db_path)
         self.db_path.mkdir(parents=True, exist_ok=True)
         self.verbose = verbose
+        self.model_name = model_name
+        if quantize is True:
+            quantize = 'int8'
+        if quantize not in (False, None, 'int8', 'fp16'):
+            raise ValueError(f"Unknown quantization mode: {quantize!r}")
+        self.quantize = quantize or False
 
         # Acquire database lock to prevent concurrent access
         self.lock = DatabaseLock(db_path, timeout=None, verbose=verbose)
@@ -56,9 +110,215 @@ class BookDatabase:
         if is_first_time and self.verbose:
             print("✓ Model ready!")
 
+        # Buffer for batched inserts: chunks from many books are coalesced
+        # into a single collection.add call to amortize per-call overhead.
+        # 'books' holds the pending sidecar rows; they (and the BM25 and
+        # indexed-id updates) are applied only once the vector write for
+        # their chunks has succeeded, so a failed flush leaves no book
+        # marked indexed without its chunks
+        self._batch_size = 128
+        self._buf = {"ids": [], "documents": [], "metadatas": [], "books": []}
+        self._pending_ids = set()
+
+        # Cache of already-indexed book IDs, loaded lazily on first use
+        self._indexed_ids = None
+
+        # Sentence-transformers model, loaded lazily on first embed
+        self._embedder = None
+
+        # BM25 sparse index over chunk tokens, used for hybrid search.
+        # Corpus is loaded lazily from disk and persisted on close
+        self._bm25_path = self.db_path / "bm25.pkl"
+        self._bm25_ids = None
+        self._bm25_corpus = None
+        self._bm25 = None
+        self._bm25_dirty = False
+
+        # Exact FAISS index over the collection's embeddings, built
+        # lazily for small collections and dropped whenever chunks land
+        self._faiss_index = None
+        self._faiss_ids = None
+
+        # Sidecar table of per-book metadata; avoids pulling every chunk's
+        # metadata out of ChromaDB just to list or look up books
+        # check_same_thread=False: searches may run on a worker thread
+        # while the spinner animates; access is serialized by self.lock
+        # and the GIL around individual execute calls
+        self._meta_db = sqlite3.connect(
+            str(self.db_path / "books.sqlite"), check_same_thread=False
+        )
+        self._meta_db.execute(
+            "CREATE TABLE IF NOT EXISTS books ("
+            "id TEXT PRIMARY KEY, filename TEXT, title TEXT, "
+            "author TEXT, format TEXT, length INTEGER)"
+        )
+        # Fingerprint columns for dedup and change detection; added lazily
+        # so databases created before them keep working
+        columns = {row[1] for row in self._meta_db.execute("PRAGMA table_info(books)")}
+        if 'content_hash' not in columns:
+            self._meta_db.execute("ALTER TABLE books ADD COLUMN content_hash TEXT")
+        if 'mtime_ns' not in columns:
+            self._meta_db.execute("ALTER TABLE books ADD COLUMN mtime_ns INTEGER")
+            self._meta_db.execute("ALTER TABLE books ADD COLUMN size INTEGER")
+        self._meta_db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_books_content_hash "
+            "ON books(content_hash)"
+        )
+        self._meta_db.commit()
+
+    def _get_embedder(self):
+        """
+        Get the embedding model, loading it on first use.
+
+        Embeddings are computed here in batches and passed explicitly to
+        ChromaDB, which is much faster than letting ChromaDB embed each
+        insert internally (and uses the GPU when one is available). The
+        model itself comes from the process-level get_encoder cache, so
+        databases opened at different paths still share one copy.
+        """
+        if self._embedder is None:
+            self._embedder = get_encoder(self.model_name)
+        return self._embedder
+
+    def _embed(self, texts: List[str]):
+        """Compute normalized embeddings for a batch of texts."""
+        return self._get_embedder().encode(
+            texts,
+            batch_size=ENCODE_BATCH_SIZE,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+
+    def _get_indexed_ids(self) -> set:
+        """
+        Get the set of already-indexed book IDs, loading it once from the
+        collection instead of doing a per-book roundtrip.
+        """
+        if self._indexed_ids is None:
+            try:
+                results = self.collection.get(include=[])
+                self._indexed_ids = {
+                    '_'.join(chunk_id.split('_')[:-2])
+                    for chunk_id in results['ids']
+                }
+            except Exception:
+                self._indexed_ids = set()
+        return self._indexed_ids
+
+    def _ensure_bm25_corpus(self):
+        """Load the persisted BM25 corpus on first use."""
+        if self._bm25_ids is not None:
+            return
+        try:
+            with open(self._bm25_path, 'rb') as f:
+                self._bm25_ids, self._bm25_corpus = pickle.load(f)
+        except (OSError, pickle.PickleError, ValueError):
+            self._bm25_ids, self._bm25_corpus = [], []
+
+    def _get_bm25(self):
+        """Get the BM25 index, (re)building it from the corpus if needed."""
+        self._ensure_bm25_corpus()
+        if self._bm25 is None and self._bm25_corpus:
+            from rank_bm25 import BM25Okapi
+            self._bm25 = BM25Okapi(self._bm25_corpus)
+        return self._bm25
+
+    def _save_bm25_corpus(self):
+        """Persist the BM25 corpus alongside the SQLite sidecar."""
+        if not self._bm25_dirty or self._bm25_ids is None:
+            return
+        try:
+            with open(self._bm25_path, 'wb') as f:
+                pickle.dump((self._bm25_ids, self._bm25_corpus), f)
+            self._bm25_dirty = False
+        except OSError as e:
+            print(f"Error saving BM25 index: {e}")
+
     def _generate_book_id(self, file_path: str) -> str:
-        """Generate a unique ID for a book based on its path."""
-        return hashlib.md5(file_path.encode()).hexdigest()
+        """
+        Generate a unique ID for a book based on its path.
+
+        Uses BLAKE3 (SIMD-accelerated, much faster than MD5); IDs are only
+        ever compared for equality so a non-cryptographic-strength digest
+        truncated to 32 hex chars is plenty.
+        """
+        return blake3(file_path.encode()).hexdigest()[:32]
+
+    @staticmethod
+    def fingerprint_file(file_path: str) -> Optional[str]:
+        """
+        Content fingerprint: BLAKE3 of file size plus the first 64 KiB.
+
+        Reading one head block is enough to tell books apart (two books
+        with identical size and identical first 64 KiB are the same file
+        for our purposes) and keeps fingerprinting I/O-cheap even for
+        multi-hundred-megabyte PDFs.
+
+        Returns:
+            Hex digest, or None if the file cannot be read
+        """
+        try:
+            size = os.path.getsize(file_path)
+            with open(file_path, 'rb') as f:
+                head = f.read(64 * 1024)
+            return blake3(size.to_bytes(8, 'little') + head).hexdigest()[:32]
+        except OSError:
+            return None
+
+    def register_duplicate(self, file_path, content_hash: Optional[str] = None) -> bool:
+        """
+        Alias a file to an already-indexed book with identical content.
+
+        If another path with the same content fingerprint is already in
+        the database (the file was renamed or copied), record this path
+        as an alias of it instead of re-extracting and re-embedding. The
+        existing chunks keep serving search results.
+
+        Args:
+            file_path: Path of the candidate file
+            content_hash: Precomputed fingerprint_file() result, to avoid
+                hashing the same file twice
+
+        Returns:
+            True if the file was recognized and aliased, False if it
+            still needs full indexing
+        """
+        path_str = str(file_path)
+        # Book IDs are keyed the same way add_book keys them: on the
+        # file's name as recorded by the extractors
+        book_id = self._generate_book_id(os.path.basename(path_str))
+        if book_id in self._get_indexed_ids():
+            return True
+
+        if content_hash is None:
+            content_hash = self.fingerprint_file(path_str)
+        if content_hash is None:
+            return False
+
+        row = self._meta_db.execute(
+            "SELECT title, author, format, length FROM books "
+            "WHERE content_hash = ? LIMIT 1",
+            (content_hash,)
+        ).fetchone()
+        if row is None:
+            return False
+
+        try:
+            st = os.stat(path_str)
+            mtime_ns, size = st.st_mtime_ns, st.st_size
+        except OSError:
+            mtime_ns, size = None, None
+        self._meta_db.execute(
+            "INSERT OR IGNORE INTO books "
+            "(id, filename, title, author, format, length, "
+            "content_hash, mtime_ns, size) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (book_id, os.path.basename(path_str),
+             row[0], row[1], row[2], row[3], content_hash, mtime_ns, size)
+        )
+        self._get_indexed_ids().add(book_id)
+        return True
 
     def _chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
         """
@@ -72,26 +332,25 @@ class BookDatabase:
         Returns:
             List of text chunks
         """
+        # Find all sentence boundaries in one compiled-regex pass instead
+        # of rescanning each chunk with rfind; each offset points just
+        # past the punctuation mark
+        boundaries = [m.start() + 1 for m in _SENTENCE_RE.finditer(text)]
+
         chunks = []
         start = 0
+        text_len = len(text)
 
-        while start < len(text):
+        while start < text_len:
             end = start + chunk_size
-            chunk = text[start:end]
-
-            # Try to break at sentence boundaries
-            if end < len(text):
-                # Look for the last period, question mark, or exclamation mark
-                last_sentence = max(
-                    chunk.rfind('. '),
-                    chunk.rfind('? '),
-                    chunk.rfind('! ')
-                )
-                if last_sentence > chunk_size // 2:  # Only if it's not too early
-                    chunk = chunk[:last_sentence + 1]
-                    end = start + last_sentence + 1
 
-            chunks.append(chunk.strip())
+            # Try to break at the last sentence boundary within the chunk
+            if end < text_len and boundaries:
+                idx = bisect.bisect_right(boundaries, end - 1) - 1
+                if idx >= 0 and boundaries[idx] - start > chunk_size // 2:  # Only if it's not too early
+                    end = boundaries[idx]
+
+            chunks.append(text[start:end].strip())
             start = end - overlap
 
         return chunks
@@ -110,14 +369,11 @@ class BookDatabase:
             # Generate book ID
             book_id = self._generate_book_id(book_data['filename'])
 
-            # Check if book already exists
-            try:
-                existing = self.collection.get(ids=[book_id])
-                if existing['ids']:
-                    print(f"Book already indexed: {book_data['filename']}")
-                    return True
-            except:
-                pass
+            # Check if book already exists (cached set, no DB roundtrip);
+            # pending books are still in the buffer but count as seen
+            if book_id in self._get_indexed_ids() or book_id in self._pending_ids:
+                print(f"Book already indexed: {book_data['filename']}")
+                return True
 
             # Chunk the content for better search results
             content = book_data.get('content', '')
@@ -127,28 +383,44 @@ class BookDatabase:
 
             chunks = self._chunk_text(content)
 
-            # Prepare metadata (without content to save space)
-            metadata = {
-                'title': str(book_data.get('title', 'Unknown')),
-                'author': str(book_data.get('author', 'Unknown')),
-                'filename': str(book_data.get('filename', '')),
-                'format': str(book_data.get('format', '')),
-                'length': str(book_data.get('length', 0))
-            }
-
-            # Create IDs and metadata for each chunk
+            # Create IDs and metadata for each chunk. Chunks carry only the
+            # book_id/chunk_id pair; the per-book metadata lives once in the
+            # sidecar table instead of being replicated onto every chunk
             chunk_ids = [f"{book_id}_chunk_{i}" for i in range(len(chunks))]
             chunk_metadatas = [
-                {**metadata, 'chunk_id': str(i), 'total_chunks': str(len(chunks))}
+                {'book_id': book_id, 'chunk_id': i}
                 for i in range(len(chunks))
             ]
 
-            # Add to ChromaDB
-            self.collection.add(
-                documents=chunks,
-                ids=chunk_ids,
-                metadatas=chunk_metadatas
+            # Buffer the chunks; they are written in batches so that a
+            # single collection.add call spans chunks from many books
+            self._buf['ids'].extend(chunk_ids)
+            self._buf['documents'].extend(chunks)
+            self._buf['metadatas'].extend(chunk_metadatas)
+
+            # Stage the per-book metadata row, with content and stat
+            # fingerprints so renamed/copied files can be aliased and
+            # unchanged files recognized without reading them. The row
+            # (and the BM25/indexed-id updates) only land in flush(),
+            # after the chunks are safely in ChromaDB.
+            source_path = str(book_data.get('path') or book_data.get('filename', ''))
+            try:
+                st = os.stat(source_path)
+                mtime_ns, size = st.st_mtime_ns, st.st_size
+            except OSError:
+                mtime_ns, size = None, None
+            self._buf['books'].append(
+                (book_id, str(book_data.get('filename', '')),
+                 str(book_data.get('title', 'Unknown')),
+                 str(book_data.get('author', 'Unknown')),
+                 str(book_data.get('format', '')),
+                 int(book_data.get('length', 0)),
+                 self.fingerprint_file(source_path), mtime_ns, size)
             )
+            self._pending_ids.add(book_id)
+
+            if len(self._buf['ids']) >= self._batch_size:
+                self.flush()
 
             print(f"✓ Indexed: {book_data['title']} by {book_data['author']} ({len(chunks)} chunks)")
             return True
@@ -157,10 +429,207 @@ class BookDatabase:
             print(f"Error adding book to database: {e}")
             return False
 
+    def set_batch_size(self, batch_size: int):
+        """
+        Set how many chunks are buffered before a collection.add call.
+
+        ChromaDB throughput is dominated by per-call overhead, so larger
+        batches are faster up to a point; values are kept in the 50-250
+        range the ChromaDB performance docs recommend.
+
+        Args:
+            batch_size: Number of chunks per insert batch (50-250)
+
+        Raises:
+            ValueError: If batch_size is outside the 50-250 range
+        """
+        if not 50 <= int(batch_size) <= 250:
+            raise ValueError(
+                f"batch_size must be between 50 and 250, got {batch_size}"
+            )
+        self._batch_size = int(batch_size)
+
+    def add_books_bulk(self, book_datas: List[Dict]) -> int:
+        """
+        Add a batch of books and write them out in one go.
+
+        Each book's chunks land in the shared insert buffer, so the whole
+        batch is embedded and committed to ChromaDB in as few
+        collection.add calls as the buffer size allows, instead of one
+        round-trip per book.
+
+        Args:
+            book_datas: List of book_data dictionaries (see add_book)
+
+        Returns:
+            Number of books added successfully
+        """
+        success = sum(1 for book_data in book_datas if self.add_book(book_data))
+        self.flush()
+        return success
+
+    def flush(self):
+        """
+        Write any buffered chunks to ChromaDB and commit their books.
+
+        The vector write goes first; only when it succeeds are the
+        sidecar rows, BM25 corpus and indexed-id cache updated and
+        committed. If embedding or the ChromaDB add raises, the buffer
+        is left intact (a later flush retries it) and no book is marked
+        indexed without its chunks.
+        """
+        if not self._buf['ids']:
+            if self._meta_db is not None:
+                self._meta_db.commit()
+            return
+
+        # Encode the whole buffer in one pass so the tokenizer and the
+        # model forward see batches spanning many books, not one book's
+        # worth of chunks at a time
+        embeddings = self._embed(self._buf['documents'])
+        self.collection.add(
+            ids=self._buf['ids'],
+            documents=self._buf['documents'],
+            metadatas=self._buf['metadatas'],
+            embeddings=embeddings.tolist()
+        )
+        # The in-memory FAISS mirror no longer matches the collection
+        self._faiss_index = None
+        self._faiss_ids = None
+
+        # Chunks are durable; now make their books visible everywhere
+        self._ensure_bm25_corpus()
+        for chunk_id, document in zip(self._buf['ids'], self._buf['documents']):
+            self._bm25_ids.append(chunk_id)
+            self._bm25_corpus.append(_TOKEN_RE.findall(document.lower()))
+        self._bm25 = None
+        self._bm25_dirty = True
+
+        for row in self._buf['books']:
+            self._meta_db.execute(
+                "INSERT OR IGNORE INTO books "
+                "(id, filename, title, author, format, length, "
+                "content_hash, mtime_ns, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row
+            )
+        self._meta_db.commit()
+        self._get_indexed_ids().update(self._pending_ids)
+        # Persist the corpus with the commit: background workers exit
+        # via os._exit and never run close(), so waiting until then
+        # would drop every chunk they indexed from the sparse leg
+        self._save_bm25_corpus()
+
+        self._buf = {"ids": [], "documents": [], "metadatas": [], "books": []}
+        self._pending_ids = set()
+
+    def export_to_faiss(self):
+        """
+        Build an exact FAISS inner-product index over the collection.
+
+        All stored embeddings are pulled out of ChromaDB once and packed
+        into a faiss.IndexFlatIP; because the vectors are normalized,
+        inner product equals cosine similarity and the brute-force SIMD
+        scan beats an HNSW traversal for small collections. The index
+        and its aligned chunk-id list are cached until the next flush.
+
+        Returns:
+            (index, ids) tuple, or None if FAISS is unavailable or the
+            collection is empty
+        """
+        if self._faiss_index is not None:
+            return self._faiss_index, self._faiss_ids
+
+        try:
+            import faiss
+        except ImportError:
+            return None
+
+        got = self.collection.get(include=['embeddings'])
+        if not got['ids']:
+            return None
+
+        vectors = np.asarray(got['embeddings'], dtype='float32')
+        if self.quantize:
+            # Scalar quantization: 4x (int8) or 2x (fp16) less vector
+            # memory and bandwidth than fp32, for typically <1% recall@10
+            # loss at 8 bits and none measurable at fp16; queries stay
+            # float32, FAISS compares asymmetrically
+            qtype = (faiss.ScalarQuantizer.QT_fp16 if self.quantize == 'fp16'
+                     else faiss.ScalarQuantizer.QT_8bit)
+            index = faiss.IndexScalarQuantizer(
+                vectors.shape[1], qtype, faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(vectors)
+        else:
+            index = faiss.IndexFlatIP(vectors.shape[1])
+        index.add(vectors)
+
+        self._faiss_index = index
+        self._faiss_ids = got['ids']
+        return self._faiss_index, self._faiss_ids
+
+    def _query_dense(self, query_embeddings, n_results: int):
+        """
+        Run the dense search leg, via FAISS when the collection is small.
+
+        Accepts one embedding per query and resolves them all in a single
+        backend call - both FAISS and ChromaDB amortize their traversal
+        setup across a query batch. Returns one (ids, metadatas,
+        distances, documents) tuple per query, with distances as squared
+        L2 so downstream scoring is identical on both paths.
+        """
+        exported = None
+        if self.collection.count() <= _FAISS_MAX_CHUNKS:
+            exported = self.export_to_faiss()
+
+        if exported is None:
+            results = self.collection.query(
+                query_embeddings=query_embeddings.tolist(),
+                n_results=n_results
+            )
+            return [
+                (
+                    results['ids'][i] if results['ids'] else [],
+                    results['metadatas'][i] if results['metadatas'] else [],
+                    results['distances'][i] if results['distances'] else [],
+                    results['documents'][i] if results['documents'] else []
+                )
+                for i in range(len(query_embeddings))
+            ]
+
+        index, faiss_ids = exported
+        scores, positions = index.search(
+            query_embeddings.astype('float32'), min(n_results, index.ntotal)
+        )
+
+        # One metadata fetch covering every hit across all queries
+        unique = list({faiss_ids[pos]
+                       for row in positions for pos in row if pos >= 0})
+        got = self.collection.get(ids=unique, include=['metadatas', 'documents'])
+        by_id = dict(zip(got['ids'], zip(got['metadatas'], got['documents'])))
+
+        out = []
+        for row_positions, row_scores in zip(positions, scores):
+            ids_ = [faiss_ids[pos] for pos in row_positions if pos >= 0]
+            # For normalized vectors ||q - x||^2 == 2 - 2 * (q . x)
+            dists_ = [2.0 - 2.0 * float(score)
+                      for pos, score in zip(row_positions, row_scores) if pos >= 0]
+            metas_ = [by_id[cid][0] for cid in ids_]
+            docs_ = [by_id[cid][1] for cid in ids_]
+            out.append((ids_, metas_, dists_, docs_))
+        return out
+
     def search(self, query: str, n_results: int = 5) -> List[Dict]:
         """
         Search for books using natural language query.
 
+        Combines dense vector search with a BM25 sparse ranking via
+        reciprocal-rank fusion. Both legs over-fetch 3x chunks: fusion
+        re-ranks what was retrieved but cannot widen it, and without the
+        headroom one book's chunks can crowd every other book out of the
+        candidate pool before grouping.
+
         Args:
             query: Natural language search query
             n_results: Maximum number of results to return
@@ -169,59 +638,171 @@ class BookDatabase:
             List of matching books with metadata and relevance scores
         """
         try:
-            # Query ChromaDB with semantic search
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results * 3  # Get more results to deduplicate books
-            )
+            # Embed the query with the same model used for the chunks
+            query_embedding = self._embed([query])
+
+            # Dense leg: exact FAISS scan for small collections,
+            # ChromaDB's HNSW otherwise
+            dense = self._query_dense(query_embedding, n_results * 3)[0]
 
-            if not results['ids'] or not results['ids'][0]:
-                return []
-
-            # Process and deduplicate results (group by book)
-            books_map = {}
-
-            for i, chunk_id in enumerate(results['ids'][0]):
-                # Extract book ID from chunk ID
-                book_id = '_'.join(chunk_id.split('_')[:-2])
-
-                metadata = results['metadatas'][0][i]
-                distance = results['distances'][0][i]
-                document = results['documents'][0][i]
-
-                if book_id not in books_map:
-                    books_map[book_id] = {
-                        'title': metadata['title'],
-                        'author': metadata['author'],
-                        'filename': metadata['filename'],
-                        'format': metadata['format'],
-                        'length': metadata['length'],
-                        'relevance_score': 1 - distance,  # Convert distance to similarity
-                        'matched_chunks': [],
-                        'best_match': document[:300] + "..." if len(document) > 300 else document
-                    }
-
-                # Keep track of all matching chunks
-                books_map[book_id]['matched_chunks'].append({
-                    'text': document,
-                    'score': 1 - distance
-                })
-
-                # Update best match if this chunk is more relevant
-                if (1 - distance) > books_map[book_id]['relevance_score']:
-                    books_map[book_id]['relevance_score'] = 1 - distance
-                    books_map[book_id]['best_match'] = document[:300] + "..." if len(document) > 300 else document
-
-            # Convert to list and sort by relevance
-            books = list(books_map.values())
-            books.sort(key=lambda x: x['relevance_score'], reverse=True)
-
-            return books[:n_results]
+            return self._fuse_and_group(query, query_embedding[0], dense, n_results)
 
         except Exception as e:
             print(f"Error searching database: {e}")
             return []
 
+    def search_batch(self, queries: List[str], n_results: int = 5) -> List[List[Dict]]:
+        """
+        Search several queries in one pass.
+
+        All queries are embedded in a single model forward and resolved
+        with one dense backend call, which amortizes the per-query setup
+        cost; results come back in query order.
+
+        Args:
+            queries: Natural language search queries
+            n_results: Maximum number of results per query
+
+        Returns:
+            One result list per query (same shape as search())
+        """
+        if not queries:
+            return []
+
+        try:
+            embeddings = self._embed(list(queries))
+            dense = self._query_dense(embeddings, n_results * 3)
+            return [
+                self._fuse_and_group(query, embeddings[i], dense[i], n_results)
+                for i, query in enumerate(queries)
+            ]
+        except Exception as e:
+            print(f"Error searching database: {e}")
+            return [[] for _ in queries]
+
+    def _fuse_and_group(self, query: str, query_embedding, dense,
+                        n_results: int) -> List[Dict]:
+        """
+        Fuse a query's dense hits with BM25 and group chunks into books.
+
+        Args:
+            query: The query text (tokenized for the sparse leg)
+            query_embedding: The query's embedding vector
+            dense: (ids, metadatas, distances, documents) from the dense leg
+            n_results: Maximum number of books to return
+        """
+        ids_, metas_, dists_, docs_ = dense
+
+        # chunk_id -> (metadata, distance, document)
+        chunk_info = {
+            chunk_id: (metadata, distance, document)
+            for chunk_id, metadata, distance, document
+            in zip(ids_, metas_, dists_, docs_)
+        }
+        dense_rank = {chunk_id: rank for rank, chunk_id in enumerate(ids_)}
+
+        # Sparse leg: BM25 over the chunk tokens (in-memory, numpy)
+        sparse_rank = {}
+        bm25 = self._get_bm25()
+        if bm25 is not None:
+            scores = bm25.get_scores(_TOKEN_RE.findall(query.lower()))
+            # Same 3x over-fetch as the dense leg, for the same reason
+            top = np.argsort(scores)[::-1][:n_results * 3]
+            for rank, idx in enumerate(top):
+                if scores[idx] > 0:
+                    sparse_rank[self._bm25_ids[idx]] = rank
+
+        if not chunk_info and not sparse_rank:
+            return []
+
+        # Reciprocal-rank fusion of the two rankings
+        fused = {}
+        for chunk_id in dense_rank.keys() | sparse_rank.keys():
+            score = 0.0
+            if chunk_id in dense_rank:
+                score += 1.0 / (_RRF_K + dense_rank[chunk_id])
+            if chunk_id in sparse_rank:
+                score += 1.0 / (_RRF_K + sparse_rank[chunk_id])
+            fused[chunk_id] = score
+
+        # Chunks found only by BM25 need their data (and a distance,
+        # computed from the stored embedding) fetched from ChromaDB
+        missing = [cid for cid in fused if cid not in chunk_info]
+        if missing:
+            got = self.collection.get(
+                ids=missing,
+                include=['metadatas', 'documents', 'embeddings']
+            )
+            for chunk_id, metadata, document, embedding in zip(
+                    got['ids'], got['metadatas'], got['documents'], got['embeddings']):
+                distance = float(((query_embedding - np.asarray(embedding)) ** 2).sum())
+                chunk_info[chunk_id] = (metadata, distance, document)
+
+        # Group chunks into books in fused-score order
+        books_map = {}
+        book_fused = {}
+
+        for chunk_id in sorted(fused, key=fused.get, reverse=True):
+            if chunk_id not in chunk_info:
+                continue
+            metadata, distance, document = chunk_info[chunk_id]
+            book_id = _CHUNK_ID_RE.match(chunk_id).group(1)
+
+            if book_id not in books_map:
+                book_fused[book_id] = fused[chunk_id]
+                books_map[book_id] = {
+                    **self._get_book_info(book_id, metadata),
+                    'relevance_score': 1 - distance,  # Convert distance to similarity
+                    'matched_chunks': [],
+                    'best_match': document[:300] + "..." if len(document) > 300 else document
+                }
+
+            # Keep track of all matching chunks
+            books_map[book_id]['matched_chunks'].append({
+                'text': document,
+                'score': 1 - distance
+            })
+
+            # The fused order is not distance order, so the best dense
+            # match for a book may arrive later
+            if (1 - distance) > books_map[book_id]['relevance_score']:
+                books_map[book_id]['relevance_score'] = 1 - distance
+                books_map[book_id]['best_match'] = document[:300] + "..." if len(document) > 300 else document
+
+        # Sort books by their best fused chunk score
+        books = sorted(books_map, key=book_fused.get, reverse=True)
+
+        return [books_map[book_id] for book_id in books[:n_results]]
+
+    def _get_book_info(self, book_id: str, chunk_metadata: Dict) -> Dict:
+        """
+        Look up a book's metadata by ID from the sidecar table.
+
+        Falls back to the chunk's own metadata for databases indexed
+        before per-book metadata moved off the chunks.
+        """
+        row = self._meta_db.execute(
+            "SELECT title, author, filename, format, length FROM books WHERE id = ? LIMIT 1",
+            (book_id,)
+        ).fetchone()
+
+        if row is not None:
+            return {
+                'title': row[0],
+                'author': row[1],
+                'filename': row[2],
+                'format': row[3],
+                'length': row[4]
+            }
+
+        return {
+            'title': chunk_metadata.get('title', 'Unknown'),
+            'author': chunk_metadata.get('author', 'Unknown'),
+            'filename': chunk_metadata.get('filename', ''),
+            'format': chunk_metadata.get('format', ''),
+            'length': chunk_metadata.get('length', 0)
+        }
+
     def get_stats(self) -> Dict:
         """Get statistics about the database."""
         try:
@@ -242,29 +823,52 @@ class BookDatabase:
             Dictionary mapping file paths to book metadata
         """
         try:
-            # Get all documents from the collection
-            results = self.collection.get()
-
-            if not results or not results['metadatas']:
-                return {}
-
-            # Extract unique books (deduplicate chunks)
-            books = {}
-            for metadata in results['metadatas']:
-                filename = metadata.get('filename', '')
-                if filename and filename not in books:
-                    books[filename] = {
-                        'title': metadata.get('title', 'Unknown'),
-                        'author': metadata.get('author', 'Unknown'),
-                        'format': metadata.get('format', ''),
-                        'length': metadata.get('length', 0)
-                    }
-
-            return books
+            query = ("SELECT filename, title, author, format, length, "
+                     "mtime_ns, size FROM books")
+            rows = self._meta_db.execute(query).fetchall()
+
+            if not rows and self.collection.count() > 0:
+                # Database predates the sidecar table: backfill it once
+                # from the chunk metadata in ChromaDB
+                self._backfill_meta_db()
+                rows = self._meta_db.execute(query).fetchall()
+
+            return {
+                filename: {
+                    'title': title,
+                    'author': author,
+                    'format': fmt,
+                    'length': length,
+                    'mtime_ns': mtime_ns,
+                    'size': size
+                }
+                for filename, title, author, fmt, length, mtime_ns, size in rows
+            }
         except Exception as e:
             print(f"Error getting indexed files: {e}")
             return {}
 
+    def _backfill_meta_db(self):
+        """Populate the sidecar table from existing ChromaDB chunk metadata."""
+        results = self.collection.get()
+        if not results or not results['metadatas']:
+            return
+
+        seen = set()
+        for metadata in results['metadatas']:
+            filename = metadata.get('filename', '')
+            if not filename or filename in seen:
+                continue
+            seen.add(filename)
+            self._meta_db.execute(
+                "INSERT OR IGNORE INTO books (id, filename, title, author, format, length) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self._generate_book_id(filename), filename,
+                 metadata.get('title', 'Unknown'), metadata.get('author', 'Unknown'),
+                 metadata.get('format', ''), int(metadata.get('length', 0) or 0))
+            )
+        self._meta_db.commit()
+
     def is_book_indexed(self, file_path: str) -> bool:
         """
         Check if a book is already indexed in the database.
@@ -277,14 +881,33 @@ class BookDatabase:
         """
         try:
             book_id = self._generate_book_id(file_path)
-            existing = self.collection.get(ids=[book_id])
-            return bool(existing['ids'])
-        except:
+            row = self._meta_db.execute(
+                "SELECT 1 FROM books WHERE id = ? LIMIT 1", (book_id,)
+            ).fetchone()
+            return row is not None
+        except Exception:
             return False
 
     def reset(self):
-        """Reset the database (delete all data)."""
+        """
+        Reset the database (delete all data).
+
+        Note: book IDs switched from MD5 to BLAKE3; databases created
+        before that change should be reset and re-indexed once.
+        """
         try:
+            self._buf = {"ids": [], "documents": [], "metadatas": [], "books": []}
+            self._pending_ids = set()
+            self._indexed_ids = None
+            # Drop the FAISS mirror like flush() does; a stale index
+            # would keep serving chunk ids the collection no longer has
+            self._faiss_index = None
+            self._faiss_ids = None
+            self._bm25_ids, self._bm25_corpus, self._bm25 = [], [], None
+            self._bm25_dirty = False
+            self._bm25_path.unlink(missing_ok=True)
+            self._meta_db.execute("DELETE FROM books")
+            self._meta_db.commit()
             self.client.delete_collection(name="books")
 
             if self.verbose:
@@ -298,8 +921,38 @@ class BookDatabase:
         except Exception as e:
             print(f"Error resetting database: {e}")
 
+    def detach(self):
+        """
+        Disown inherited resources without closing them.
+
+        After a fork the child shares the parent's lock-file descriptor,
+        and an unlock there releases the parent's "exclusive" lock too.
+        Dropping the buffer and handles turns close() - including the
+        one the destructor runs - into a no-op, so the child can let go
+        of an inherited instance without touching the parent's state.
+        """
+        self._buf = {"ids": [], "documents": [], "metadatas": [], "books": []}
+        self._pending_ids = set()
+        self._bm25_dirty = False
+        self._meta_db = None
+        if self.lock:
+            self.lock.lock_file = None
+
     def close(self):
-        """Close the database and release the lock."""
+        """Flush pending writes, close the database and release the lock."""
+        if hasattr(self, '_buf'):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing buffered chunks: {e}")
+        if hasattr(self, '_bm25_dirty'):
+            self._save_bm25_corpus()
+        if hasattr(self, '_meta_db') and self._meta_db:
+            try:
+                self._meta_db.close()
+            except Exception:
+                pass
+            self._meta_db = None
         if hasattr(self, 'lock') and self.lock:
             self.lock.release()
 
@@ -315,3 +968,122 @@ class BookDatabase:
     def __del__(self):
         """Cleanup: release the lock when the object is destroyed."""
         self.close()
+
+
+# Shared per-path instances: opening a BookDatabase loads the embedding
+# model and takes the exclusive lock, so code in the same process (the
+# pre-chat indexing run and the chat session, for example) should reuse
+# one warm instance instead of paying that cost twice
+_shared_encoders: Dict[str, object] = {}
+
+
+def get_encoder(model_name: str = EMBEDDING_MODEL):
+    """
+    Get the shared SentenceTransformer for a model, loading it on first use.
+
+    Loading the model costs seconds and hundreds of MB, so one copy per
+    process is kept and handed to every BookDatabase that needs it; the
+    device is picked once (CUDA when available, otherwise CPU).
+
+    Args:
+        model_name: Sentence-transformers model identifier
+
+    Returns:
+        The shared SentenceTransformer instance for model_name
+    """
+    encoder = _shared_encoders.get(model_name)
+    if encoder is None:
+        from sentence_transformers import SentenceTransformer
+        import torch
+
+        # Leave half the cores to ChromaDB's HNSW threads; with both
+        # pools at cpu_count the encode and search phases fight each
+        # other. Interop stays at 1 - the forward pass is one op chain.
+        if not _shared_encoders:
+            try:
+                torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                # Interop pool already started (e.g. torch used first
+                # elsewhere); keep whatever configuration exists
+                pass
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        encoder = SentenceTransformer(model_name, device=device)
+        _shared_encoders[model_name] = encoder
+    return encoder
+
+
+_shared_instances: Dict[str, BookDatabase] = {}
+
+
+def get_database(db_path: str = "./chroma_db", verbose: bool = True,
+                 quantize=False, model_name: str = EMBEDDING_MODEL) -> BookDatabase:
+    """
+    Get the shared BookDatabase for a path, opening it on first use.
+
+    Instances are keyed on the absolute path and closed automatically at
+    interpreter exit; an instance that was closed explicitly is replaced
+    by a fresh one on the next call.
+
+    Args:
+        db_path: Path to the database directory
+        verbose: Passed through when a new instance is created
+        quantize: Passed through when a new instance is created
+        model_name: Passed through when a new instance is created
+
+    Returns:
+        The shared BookDatabase instance for db_path
+    """
+    key = os.path.abspath(db_path)
+    db = _shared_instances.get(key)
+    if db is None or db._meta_db is None:
+        db = BookDatabase(db_path, verbose=verbose, quantize=quantize,
+                          model_name=model_name)
+        _shared_instances[key] = db
+    return db
+
+
+def database_is_open(db_path: str = "./chroma_db") -> bool:
+    """
+    Check whether this process holds an open shared database for a path.
+
+    Useful for deciding whether another process could acquire the
+    database lock: as long as the shared instance is open, this process
+    keeps the exclusive flock.
+
+    Args:
+        db_path: Path to the database directory
+
+    Returns:
+        True if a live shared BookDatabase exists for db_path
+    """
+    db = _shared_instances.get(os.path.abspath(db_path))
+    return db is not None and db._meta_db is not None
+
+
+def close_database(db_path: str = "./chroma_db"):
+    """
+    Close and evict the shared BookDatabase for a path, if one is open.
+
+    Closing releases the exclusive file lock, so long-lived processes
+    (like the background indexing worker) should call this when they are
+    done with the database rather than holding it until interpreter exit.
+    The next get_database() call for the same path opens a fresh instance.
+
+    Args:
+        db_path: Path to the database directory
+    """
+    db = _shared_instances.pop(os.path.abspath(db_path), None)
+    if db is not None:
+        db.close()
+
+
+@atexit.register
+def _close_shared_instances():
+    """Flush and close any shared databases at interpreter exit."""
+    for db in _shared_instances.values():
+        try:
+            db.close()
+        except Exception:
+            pass
@@ -2,6 +2,8 @@
 Database locking mechanism to prevent concurrent access from multiple processes.
 """
 import fcntl
+import signal
+import threading
 import time
 import sys
 from pathlib import Path
@@ -38,37 +40,30 @@ class DatabaseLock:
             # Open lock file
             self.lock_file = open(self.lock_file_path, 'w')
 
-            # Try to acquire lock
-            start_time = time.time()
-            shown_waiting = False
+            # Try non-blocking first so the common uncontended case is free
+            try:
+                fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if self.verbose:
+                    print("⏳ Waiting for database lock (another process is using the database)...")
 
-            while True:
-                try:
-                    # Try non-blocking lock first
-                    fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-                    # Lock acquired
-                    if shown_waiting and self.verbose:
-                        print("✓ Database lock acquired")
-                    return True
+            if self.timeout is not None and self.timeout <= 0:
+                if self.verbose:
+                    print("✗ Timeout waiting for database lock")
+                self.lock_file.close()
+                self.lock_file = None
+                return False
+
+            if self.timeout is None:
+                # Block in the kernel until the lock is released - no polling,
+                # the kernel wakes us the instant the holder lets go
+                fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX)
+                if self.verbose:
+                    print("✓ Database lock acquired")
+                return True
 
-                except BlockingIOError:
-                    # Lock is held by another process
-                    if not shown_waiting and self.verbose:
-                        print("⏳ Waiting for database lock (another process is using the database)...")
-                        shown_waiting = True
-
-                    # Check timeout
-                    if self.timeout is not None:
-                        elapsed = time.time() - start_time
-                        if elapsed >= self.timeout:
-                            if self.verbose:
-                                print(f"✗ Timeout waiting for database lock after {elapsed:.1f} seconds")
-                            self.lock_file.close()
-                            self.lock_file = None
-                            return False
-
-                    # Wait a bit before retrying
-                    time.sleep(0.5)
+            return self._acquire_with_timeout()
 
         except Exception as e:
             if self.verbose:
@@ -78,6 +73,61 @@ class DatabaseLock:
                 self.lock_file = None
             return False
 
+    def _acquire_with_timeout(self) -> bool:
+        """
+        Block on the lock with a deadline.
+
+        Uses a SIGALRM timer to interrupt a blocking flock when possible
+        (main thread only); otherwise falls back to a polling retry loop.
+
+        Returns:
+            True if lock acquired, False if timeout
+        """
+        can_use_alarm = (
+            hasattr(signal, 'setitimer')
+            and threading.current_thread() is threading.main_thread()
+        )
+
+        if can_use_alarm:
+            def _on_timeout(signum, frame):
+                raise InterruptedError("database lock timeout")
+
+            old_handler = signal.signal(signal.SIGALRM, _on_timeout)
+            try:
+                signal.setitimer(signal.ITIMER_REAL, self.timeout)
+                try:
+                    fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX)
+                    if self.verbose:
+                        print("✓ Database lock acquired")
+                    return True
+                except InterruptedError:
+                    if self.verbose:
+                        print(f"✗ Timeout waiting for database lock after {self.timeout:.1f} seconds")
+                    self.lock_file.close()
+                    self.lock_file = None
+                    return False
+            finally:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, old_handler)
+
+        # Fallback (non-main thread): poll with short sleeps
+        start_time = time.time()
+        while True:
+            try:
+                fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                if self.verbose:
+                    print("✓ Database lock acquired")
+                return True
+            except BlockingIOError:
+                elapsed = time.time() - start_time
+                if elapsed >= self.timeout:
+                    if self.verbose:
+                        print(f"✗ Timeout waiting for database lock after {elapsed:.1f} seconds")
+                    self.lock_file.close()
+                    self.lock_file = None
+                    return False
+                time.sleep(0.1)
+
     def release(self):
         """Release the database lock."""
         if self.lock_file:
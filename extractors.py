@@ -4,10 +4,15 @@ Book content extractors for PDF, EPUB, and FB2 formats.
 import re
 from pathlib import Path
 from typing import Optional
-from bs4 import BeautifulSoup
+import lxml.etree
+import lxml.html
 import ebooklib
 from ebooklib import epub
-import pypdf
+import pypdfium2 as pdfium
+
+
+# Compiled once at import; clean_text runs over megabytes of book text
+_PAGENUM_RE = re.compile(r'\n\d+\n')
 
 
 class BookExtractor:
@@ -16,17 +21,17 @@ class BookExtractor:
     @staticmethod
     def clean_text(text: str) -> str:
         """Clean and normalize extracted text."""
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        # Remove page numbers and headers/footers patterns
-        text = re.sub(r'\n\d+\n', '\n', text)
-        return text.strip()
+        # Strip page-number lines with one precompiled pass, then collapse
+        # whitespace with str.split/join, which runs entirely in C and is
+        # several times faster than an equivalent \s+ substitution
+        return ' '.join(_PAGENUM_RE.sub('\n', text).split())
 
     @staticmethod
     def extract_metadata(file_path: Path) -> dict:
         """Extract basic metadata from filename."""
         return {
             'filename': file_path.name,
+            'path': str(file_path),
             'format': file_path.suffix.lower(),
             'size': file_path.stat().st_size
         }
@@ -39,25 +44,26 @@ class PDFExtractor(BookExtractor):
     def extract(file_path: Path) -> Optional[dict]:
         """Extract text and metadata from PDF."""
         try:
-            with open(file_path, 'rb') as f:
-                reader = pypdf.PdfReader(f)
-
+            # pypdfium2 extracts text in native code (PDFium), avoiding
+            # pypdf's slow pure-Python content-stream interpretation
+            pdf = pdfium.PdfDocument(str(file_path))
+            try:
                 # Extract metadata
                 metadata = BookExtractor.extract_metadata(file_path)
-                metadata['pages'] = len(reader.pages)
+                metadata['pages'] = len(pdf)
 
                 # Try to get PDF metadata
-                if reader.metadata:
-                    metadata['title'] = reader.metadata.get('/Title', file_path.stem)
-                    metadata['author'] = reader.metadata.get('/Author', 'Unknown')
-                else:
-                    metadata['title'] = file_path.stem
-                    metadata['author'] = 'Unknown'
+                pdf_info = pdf.get_metadata_dict()
+                metadata['title'] = pdf_info.get('Title') or file_path.stem
+                metadata['author'] = pdf_info.get('Author') or 'Unknown'
 
                 # Extract text from all pages
                 text_parts = []
-                for page in reader.pages:
-                    text = page.extract_text()
+                for page in pdf:
+                    textpage = page.get_textpage()
+                    text = textpage.get_text_range()
+                    textpage.close()
+                    page.close()
                     if text:
                         text_parts.append(text)
 
@@ -66,6 +72,8 @@ class PDFExtractor(BookExtractor):
                 metadata['length'] = len(metadata['content'])
 
                 return metadata
+            finally:
+                pdf.close()
 
         except Exception as e:
             print(f"Error extracting PDF {file_path}: {e}")
@@ -89,13 +97,14 @@ class EPUBExtractor(BookExtractor):
             metadata['author'] = book.get_metadata('DC', 'creator')
             metadata['author'] = metadata['author'][0][0] if metadata['author'] else 'Unknown'
 
-            # Extract text from all items
+            # Extract text from all items; lxml.html stays in C instead
+            # of building a BeautifulSoup wrapper tree per document
             text_parts = []
             for item in book.get_items():
                 if item.get_type() == ebooklib.ITEM_DOCUMENT:
                     content = item.get_content()
-                    soup = BeautifulSoup(content, 'lxml')
-                    text = soup.get_text()
+                    root = lxml.html.fromstring(content)
+                    text = root.text_content()
                     if text:
                         text_parts.append(text)
 
@@ -117,27 +126,27 @@ class FB2Extractor(BookExtractor):
     def extract(file_path: Path) -> Optional[dict]:
         """Extract text and metadata from FB2."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            soup = BeautifulSoup(content, 'lxml-xml')
+            # Parse directly with lxml (C); bytes input lets lxml honour
+            # the XML declaration's encoding
+            with open(file_path, 'rb') as f:
+                root = lxml.etree.fromstring(f.read())
 
             # Extract metadata
             metadata = BookExtractor.extract_metadata(file_path)
 
             # FB2 metadata is in the description section
-            title_info = soup.find('title-info')
-            if title_info:
-                book_title = title_info.find('book-title')
-                metadata['title'] = book_title.text.strip() if book_title else file_path.stem
-
-                author = title_info.find('author')
-                if author:
-                    first_name = author.find('first-name')
-                    last_name = author.find('last-name')
+            title_info = root.find('.//{*}title-info')
+            if title_info is not None:
+                book_title = title_info.find('.//{*}book-title')
+                metadata['title'] = book_title.text.strip() if book_title is not None and book_title.text else file_path.stem
+
+                author = title_info.find('.//{*}author')
+                if author is not None:
+                    first_name = author.find('.//{*}first-name')
+                    last_name = author.find('.//{*}last-name')
                     author_name = ' '.join(filter(None, [
-                        first_name.text.strip() if first_name else '',
-                        last_name.text.strip() if last_name else ''
+                        first_name.text.strip() if first_name is not None and first_name.text else '',
+                        last_name.text.strip() if last_name is not None and last_name.text else ''
                     ]))
                     metadata['author'] = author_name or 'Unknown'
                 else:
@@ -147,14 +156,14 @@ class FB2Extractor(BookExtractor):
                 metadata['author'] = 'Unknown'
 
             # Extract text from body
-            body = soup.find('body')
-            if body:
+            body = root.find('.//{*}body')
+            if body is not None:
                 # Remove style and script tags
-                for tag in body(['style', 'script']):
-                    tag.decompose()
-                text = body.get_text()
+                for tag in body.findall('.//{*}style') + body.findall('.//{*}script'):
+                    tag.getparent().remove(tag)
+                text = ''.join(body.itertext())
             else:
-                text = soup.get_text()
+                text = ''.join(root.itertext())
 
             metadata['content'] = BookExtractor.clean_text(text)
             metadata['length'] = len(metadata['content'])
@@ -1,12 +1,19 @@
 """
 Book indexing pipeline to process and add books to the database.
 """
+import multiprocessing
+import os
+import stat
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Iterator, List
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeRemainingColumn
 from rich.console import Console
-from database import BookDatabase
+from database import BookDatabase, get_database
 from extractors import extract_book
+from prefetch import prefetch_many, prefetch_window
 
 
 console = Console()
@@ -16,32 +23,140 @@ class BookIndexer:
     """Indexes books from a directory into the database."""
 
     SUPPORTED_FORMATS = {'.pdf', '.epub', '.fb2'}
+    # Tuple form for str.endswith, which checks all suffixes in one C call
+    _SUFFIX_TUPLE = ('.pdf', '.epub', '.fb2')
 
-    def __init__(self, db_path: str = "./chroma_db", db: BookDatabase = None):
+    def __init__(self, db_path: str = "./chroma_db", db: BookDatabase = None,
+                 batch_size: int = None):
         """
         Initialize the indexer.
 
         Args:
             db_path: Path to the database (ignored if db is provided)
             db: Optional existing BookDatabase instance to reuse
+            batch_size: Chunks per ChromaDB insert batch (50-250); None
+                keeps the database's default
+
+        Raises:
+            ValueError: If batch_size is outside the 50-250 range
+        """
+        # Default to the shared per-path instance so an indexing run and a
+        # chat session in the same process reuse one open database; shared
+        # instances are closed at interpreter exit, not by us
+        self.db = db if db is not None else get_database(db_path)
+        self._owns_db = False
+        if batch_size is not None:
+            self.db.set_batch_size(batch_size)
+
+    def iter_books(self, directory: Path) -> Iterator[Path]:
+        """
+        Lazily yield supported book files found under a directory.
+
+        Books are yielded in filesystem order as the walk discovers them,
+        so a consumer can start working on the first file without waiting
+        for a huge tree to be enumerated (and without holding every path
+        in memory at once).
+
+        Args:
+            directory: Directory to search
+
+        Yields:
+            Book file paths
+        """
+        # One scandir-based walk instead of one rglob per extension: the
+        # tree is read once, and file-vs-dir comes from the directory
+        # entry itself, so no extra stat() per entry. Locals are bound
+        # outside the loop; this filter runs once per visited entry.
+        suffixes = self._SUFFIX_TUPLE
+        stack = [str(directory)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.name.lower().endswith(suffixes) \
+                                    and entry.is_file(follow_symlinks=False):
+                                yield Path(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def _list_books(self, directory: Path) -> List[Path]:
         """
-        self.db = db if db is not None else BookDatabase(db_path)
-        self._owns_db = db is None  # Track if we created the db
+        Non-recursive listing of supported book files.
+
+        One scandir pass with the same DirEntry/endswith matching as the
+        recursive walk: no per-file Path construction or stat() for
+        non-matching entries.
+        """
+        books = []
+        suffixes = self._SUFFIX_TUPLE
+        try:
+            with os.scandir(str(directory)) as it:
+                for entry in it:
+                    try:
+                        if entry.name.lower().endswith(suffixes) \
+                                and entry.is_file(follow_symlinks=False):
+                            books.append(Path(entry.path))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return books
 
     def find_books(self, directory: Path) -> List[Path]:
         """
         Find all supported book files in a directory.
 
+        Paths come back in natural filesystem order; none of the
+        indexing callers depend on lexicographic order, so the O(n log n)
+        sort over the whole tree is skipped.
+
         Args:
             directory: Directory to search
 
         Returns:
             List of book file paths
         """
-        books = []
-        for ext in self.SUPPORTED_FORMATS:
-            books.extend(directory.rglob(f"*{ext}"))
-        return sorted(books)
+        return list(self.iter_books(directory))
+
+    def find_books_sorted(self, directory: Path) -> List[Path]:
+        """
+        Find all supported book files, sorted by path.
+
+        For callers that need stable, reproducible ordering.
+
+        Args:
+            directory: Directory to search
+
+        Returns:
+            Sorted list of book file paths
+        """
+        return sorted(self.iter_books(directory))
+
+    def _fingerprint_many(self, paths: List[Path]) -> dict:
+        """
+        Fingerprint files concurrently on a thread pool.
+
+        The GIL is released during the stat and 64 KiB head read behind
+        each fingerprint, so threads give real I/O parallelism here and
+        an SSD can serve many head reads at once.
+
+        Args:
+            paths: Files to fingerprint
+
+        Returns:
+            Dict mapping each path to its fingerprint (or None)
+        """
+        if not paths:
+            return {}
+        workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            hashes = pool.map(lambda p: self.db.fingerprint_file(str(p)), paths)
+            return dict(zip(paths, hashes))
 
     def scan_for_new_books(self, directory: str, recursive: bool = True) -> dict:
         """
@@ -52,32 +167,64 @@ class BookIndexer:
             recursive: Whether to search subdirectories
 
         Returns:
-            Dictionary with 'new', 'indexed', and 'total' counts and lists
+            Dictionary with 'new', 'indexed', 'changed', and 'total';
+            'changed' lists books whose (mtime, size) no longer matches
+            the stored fingerprint
         """
         dir_path = Path(directory)
 
-        if not dir_path.exists():
+        # One stat() answers both "exists" and "is a directory"
+        try:
+            st = os.stat(directory)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISDIR(st.st_mode):
             console.print(f"[red]Error: Directory '{directory}' does not exist[/red]")
-            return {'new': [], 'indexed': [], 'total': 0}
+            return {'new': [], 'indexed': [], 'changed': [], 'total': 0}
 
         # Find all books in directory
         if recursive:
             books = self.find_books(dir_path)
         else:
-            books = [f for f in dir_path.iterdir()
-                     if f.is_file() and f.suffix.lower() in self.SUPPORTED_FORMATS]
-
-        # Get indexed files from database
-        indexed_files = self.db.get_indexed_files()
-        indexed_paths = set(indexed_files.keys())
+            books = self._list_books(dir_path)
+
+        # Get indexed files from database, keyed by normalized name so
+        # candidates can't spuriously miss (and get re-extracted) on
+        # case-insensitive filesystems. Normalized once here, not per book.
+        indexed_files = {
+            os.path.normcase(name): info
+            for name, info in self.db.get_indexed_files().items()
+        }
 
-        # Separate new and already-indexed books
+        # Separate new, changed, and already-indexed books
         new_books = []
         already_indexed = []
+        changed = []
+        unknown = []
 
         for book_path in books:
-            book_path_str = str(book_path)
-            if book_path_str in indexed_paths:
+            info = indexed_files.get(os.path.normcase(book_path.name))
+            if info is not None:
+                # Known name: compare the stored (mtime, size) fingerprint
+                # from a single stat() - no file contents are read. Legacy
+                # rows without a fingerprint count as unchanged, as before.
+                if info.get('mtime_ns') is not None:
+                    try:
+                        st = os.stat(str(book_path))
+                        if (st.st_mtime_ns, st.st_size) != (info['mtime_ns'], info['size']):
+                            changed.append(book_path)
+                            continue
+                    except OSError:
+                        pass
+                already_indexed.append(book_path)
+            else:
+                unknown.append(book_path)
+
+        # Unknown names need content fingerprints; hash them in parallel,
+        # then alias renamed/copied files to their existing book
+        hashes = self._fingerprint_many(unknown)
+        for book_path in unknown:
+            if self.db.register_duplicate(book_path, hashes.get(book_path)):
                 already_indexed.append(book_path)
             else:
                 new_books.append(book_path)
@@ -85,10 +232,12 @@ class BookIndexer:
         return {
             'new': new_books,
             'indexed': already_indexed,
+            'changed': changed,
             'total': len(books)
         }
 
-    def index_directory(self, directory: str, recursive: bool = True, interrupt_check=None) -> dict:
+    def index_directory(self, directory: str, recursive: bool = True, interrupt_check=None,
+                        progress_callback=None) -> dict:
         """
         Index all books in a directory.
 
@@ -96,13 +245,20 @@ class BookIndexer:
             directory: Path to the directory containing books
             recursive: Whether to search subdirectories
             interrupt_check: Optional callback function that returns True if indexing should stop
+            progress_callback: Optional callback invoked as
+                progress_callback(done, total) after each book is processed
 
         Returns:
             Dictionary with indexing statistics
         """
         dir_path = Path(directory)
 
-        if not dir_path.exists():
+        # One stat() answers both "exists" and "is a directory"
+        try:
+            st = os.stat(directory)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISDIR(st.st_mode):
             console.print(f"[red]Error: Directory '{directory}' does not exist[/red]")
             return {'success': 0, 'failed': 0, 'skipped': 0}
 
@@ -112,8 +268,7 @@ class BookIndexer:
         if recursive:
             books = self.find_books(dir_path)
         else:
-            books = [f for f in dir_path.iterdir()
-                     if f.is_file() and f.suffix.lower() in self.SUPPORTED_FORMATS]
+            books = self._list_books(dir_path)
 
         if not books:
             console.print("[yellow]No supported books found[/yellow]")
@@ -124,6 +279,31 @@ class BookIndexer:
         # Index books with progress bar
         stats = {'success': 0, 'failed': 0, 'skipped': 0}
 
+        # Cheap content-hash pass first: files that are renames/copies of
+        # already-indexed books get aliased and never reach extraction.
+        # Copies *within* this batch (same book in two folders) are also
+        # grouped here - one representative per fingerprint is extracted,
+        # the rest are aliased to it once it has been indexed.
+        remaining = []
+        batch_duplicates = []
+        seen_hashes = set()
+        hashes = self._fingerprint_many(books)
+        for book_path in books:
+            content_hash = hashes.get(book_path)
+            if self.db.register_duplicate(book_path, content_hash):
+                stats['skipped'] += 1
+            elif content_hash is not None and content_hash in seen_hashes:
+                batch_duplicates.append((book_path, content_hash))
+            else:
+                if content_hash is not None:
+                    seen_hashes.add(content_hash)
+                remaining.append(book_path)
+        books = remaining
+
+        if not books:
+            console.print("[green]All books already indexed[/green]")
+            return stats
+
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -135,31 +315,99 @@ class BookIndexer:
 
             task = progress.add_task("[cyan]Indexing books...", total=len(books))
 
-            for book_path in books:
-                # Check for interruption request
-                if interrupt_check and interrupt_check():
-                    progress.update(task, description="[yellow]Interrupted - saving progress...")
-                    break
-
-                progress.update(task, description=f"[cyan]Processing: {book_path.name}")
+            # Start kernel readahead on the first wave of files before the
+            # workers ask for them
+            prefetch_many(books)
+
+            # Extraction (PDF/EPUB/FB2 parsing) is CPU-bound and independent
+            # per file, so it fans out across all cores; database writes stay
+            # on this process because the Chroma client is not fork-safe.
+            # Prefer fork so workers inherit imported modules copy-on-write.
+            mp_context = None
+            if 'fork' in multiprocessing.get_all_start_methods():
+                mp_context = multiprocessing.get_context('fork')
+
+            executor = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=mp_context)
+            try:
+                # Pipelined with backpressure: keep a bounded window of
+                # extractions in flight and refill it as each result is
+                # consumed. Extraction (workers), embedding/insert (this
+                # process via the database's chunk buffer), and kernel
+                # readahead all overlap, but a slow insert stage can never
+                # pile up more than `window` extracted books in memory.
+                window = 2 * (os.cpu_count() or 1)
+                pending = deque(
+                    (book_path, executor.submit(extract_book, book_path))
+                    for book_path in books[:window]
+                )
+                next_i = window
+
+                # Rich re-renders the whole live display on every
+                # description change; for runs over many small files that
+                # tty traffic is measurable. Advance the (cheap) counter
+                # per book but refresh the filename at most 10x a second.
+                last_desc_update = 0.0
+                done = 0
+
+                while pending:
+                    # Check for interruption request
+                    if interrupt_check and interrupt_check():
+                        progress.update(task, description="[yellow]Interrupted - saving progress...")
+                        break
+
+                    book_path, future = pending.popleft()
+                    now = time.monotonic()
+                    if now - last_desc_update > 0.1:
+                        progress.update(task, description=f"[cyan]Processing: {book_path.name}")
+                        last_desc_update = now
+                    book_data = future.result()
+
+                    # Refill the window before the (potentially slow)
+                    # database insert so the workers never starve, and
+                    # keep kernel readahead sliding along with submission
+                    if next_i < len(books):
+                        prefetch_window(books, next_i)
+                        pending.append(
+                            (books[next_i], executor.submit(extract_book, books[next_i]))
+                        )
+                        next_i += 1
+
+                    if book_data is None:
+                        stats['failed'] += 1
+                        progress.advance(task)
+                        done += 1
+                        if progress_callback:
+                            progress_callback(done, len(books))
+                        continue
+
+                    # Add to database
+                    success = self.db.add_book(book_data)
+
+                    if success:
+                        stats['success'] += 1
+                    else:
+                        stats['failed'] += 1
 
-                # Extract book content
-                book_data = extract_book(book_path)
-
-                if book_data is None:
-                    stats['failed'] += 1
                     progress.advance(task)
-                    continue
-
-                # Add to database
-                success = self.db.add_book(book_data)
-
-                if success:
-                    stats['success'] += 1
-                else:
-                    stats['failed'] += 1
-
-                progress.advance(task)
+                    done += 1
+                    if progress_callback:
+                        progress_callback(done, len(books))
+            finally:
+                # Drop not-yet-started work on interrupt; a clean run has
+                # nothing pending so this is a no-op
+                executor.shutdown(cancel_futures=True)
+
+        # Alias within-batch copies now that their representatives are in
+        # the database; flush first so their staged sidecar rows are
+        # committed and visible to the content-hash lookup
+        if batch_duplicates:
+            self.db.flush()
+        for book_path, content_hash in batch_duplicates:
+            if self.db.register_duplicate(book_path, content_hash):
+                stats['skipped'] += 1
+            else:
+                # Representative didn't make it in (failed or interrupted)
+                stats['failed'] += 1
 
         # Print summary
         interrupted = interrupt_check and interrupt_check()
@@ -169,6 +417,8 @@ class BookIndexer:
         else:
             console.print("\n[bold green]Indexing Complete![/bold green]")
         console.print(f"  ✓ Successfully indexed: {stats['success']}")
+        if stats['skipped'] > 0:
+            console.print(f"  • Already indexed (skipped): {stats['skipped']}")
         if stats['failed'] > 0:
             console.print(f"  ✗ Failed: {stats['failed']}")
 
@@ -186,7 +436,12 @@ class BookIndexer:
         """
         path = Path(file_path)
 
-        if not path.exists():
+        # One stat() answers both "exists" and "is a regular file"
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
             console.print(f"[red]Error: File '{file_path}' does not exist[/red]")
             return False
 
@@ -222,9 +477,14 @@ class BookIndexer:
         console.print(f"  Collection: {stats.get('collection_name', 'N/A')}")
 
     def close(self):
-        """Close the database if we own it."""
-        if self._owns_db and self.db:
-            self.db.close()
+        """Flush pending work; the shared database is closed at exit."""
+        if self.db:
+            if self._owns_db:
+                self.db.close()
+            else:
+                # Make everything indexed so far visible to searches on
+                # the same shared instance
+                self.db.flush()
 
 
 if __name__ == "__main__":
@@ -4,19 +4,25 @@ Librarian - A natural language book search agent.
 Search your book library using semantic queries.
 """
 import argparse
+import asyncio
 import signal
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
 from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
-from rich.markdown import Markdown
-from prompt_toolkit import PromptSession
-from prompt_toolkit.history import InMemoryHistory
-from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
-from database import BookDatabase
-from indexer import BookIndexer
 from background_indexer import BackgroundIndexer
+from query_cache import QueryCache
+
+# The remaining rich widgets, prompt_toolkit, and anything that pulls in
+# chromadb/sentence_transformers/torch (database, indexer) are imported
+# inside the methods that use them, so `librarian.py --help` and startup
+# don't pay seconds of import cost for features that may never run.
+
+
+def _truncate(text: str, limit: int = 120) -> str:
+    """Clip text to limit characters, marking the cut with an ellipsis."""
+    return text if len(text) <= limit else text[:limit - 3] + "..."
 
 # Global flag for graceful shutdown
 _shutdown_requested = False
@@ -28,39 +34,109 @@ console = Console()
 class Librarian:
     """Interactive chat interface for book search."""
 
-    def __init__(self, db_path: str = "./chroma_db"):
-        """Initialize the librarian."""
+    # Repeated/refined queries are common in a chat session; cache recent
+    # results so they skip the embedding model and vector search entirely
+    SEARCH_CACHE_SIZE = 256
+    SEARCH_CACHE_TTL = 300.0  # seconds
+
+    def __init__(self, db_path: str = "./chroma_db", quantize=False,
+                 fast: bool = False):
+        """
+        Initialize the librarian.
+
+        Args:
+            db_path: Path to the database directory
+            quantize: Scalar-quantize the database's in-process FAISS
+                index ('int8' or 'fp16'); stored embeddings are
+                unaffected
+            fast: Use the lighter 3-layer encoder for lower CPU query
+                latency. Only valid against a collection that was also
+                indexed in fast mode - embeddings from different models
+                don't share a space.
+        """
         self.db_path = db_path
-        self.db = None  # Lazy load database
-        self._indexer = None  # Lazy load indexer
+        self.quantize = quantize
+        self.fast = fast
+        # db and indexer are cached_property descriptors: loaded on first
+        # touch, then served straight from the instance __dict__
         self.bg_indexer = BackgroundIndexer()  # Background indexing
-        # Create prompt session with history and auto-suggestions
+        # (query, n_results) -> results; cleared whenever indexing
+        # changes the library
+        self._query_cache = QueryCache(
+            max_size=self.SEARCH_CACHE_SIZE,
+            ttl_seconds=self.SEARCH_CACHE_TTL
+        )
+        # True once a search has seen total_chunks > 0; lets later
+        # searches skip the get_stats round-trip. Reset with the cache.
+        self._known_nonempty = False
+        # Searches run here so the main thread stays free to animate the
+        # status spinner and honor Ctrl+C while the model/DB work
+        self._search_pool = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="search"
+        )
+        # Command dispatch table: one dict lookup per command instead of
+        # an if/elif cascade, and a natural place to register new ones
+        self._commands = {
+            '/quit': self._cmd_quit,
+            '/exit': self._cmd_quit,
+            '/help': self._cmd_help,
+            '/stats': self._cmd_stats,
+            '/index': self._cmd_index,
+            '/index-bg': self._cmd_index_bg,
+            '/check': self._cmd_check,
+            '/index-status': self._cmd_index_status,
+        }
+        # Column skeleton for the results table; a rich Table cannot be
+        # reused across prints, but its layout never changes
+        self._table_columns = [
+            ("Title", "cyan", 25),
+            ("Author", "magenta", 18),
+            ("Format", "green", 8),
+            ("File", "blue", 30),
+            ("Match", "yellow", 40),
+        ]
+        from prompt_toolkit import PromptSession
+        from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
+        from prompt_toolkit.history import FileHistory
+
+        # Create prompt session with history and auto-suggestions;
+        # history persists across sessions so auto-suggest and Ctrl+R
+        # work from the first prompt instead of starting cold
         self.session = PromptSession(
-            history=InMemoryHistory(),
+            history=FileHistory(str(Path.home() / ".librarian_history")),
             auto_suggest=AutoSuggestFromHistory(),
             enable_history_search=True
         )
 
-    @property
+    @cached_property
     def indexer(self):
-        """Lazy load the indexer when needed."""
-        if self._indexer is None:
-            console.print("[dim]Initializing indexer...[/dim]")
-            # Reuse the existing database instance to avoid lock conflicts
-            db = self._get_database()
-            self._indexer = BookIndexer(self.db_path, db=db)
-        return self._indexer
-
-    def _get_database(self):
-        """Lazy load the database when needed."""
-        if self.db is None:
-            console.print("\n[dim]Loading database...[/dim]")
-            self.db = BookDatabase(self.db_path, verbose=True)
-            console.print("[dim]Database ready.[/dim]\n")
-        return self.db
+        """Lazy load the indexer on first access, then cache it."""
+        from indexer import BookIndexer
+
+        console.print("[dim]Initializing indexer...[/dim]")
+        # Reuse the existing database instance to avoid lock conflicts
+        return BookIndexer(self.db_path, db=self.db)
+
+    @cached_property
+    def db(self):
+        """Lazy load the database on first access, then cache it."""
+        from database import EMBEDDING_MODEL, FAST_EMBEDDING_MODEL, get_database
+
+        console.print("\n[dim]Loading database...[/dim]")
+        # Shared per-path instance: reuses a database (and its loaded
+        # model) already opened earlier in this process
+        model = FAST_EMBEDDING_MODEL if self.fast else EMBEDDING_MODEL
+        db = get_database(self.db_path, verbose=True, quantize=self.quantize,
+                          model_name=model)
+        console.print("[dim]Database ready.[/dim]\n")
+        return db
+
+    @cached_property
+    def _welcome_panel(self):
+        """Welcome panel, rendered once; the markdown never changes."""
+        from rich.markdown import Markdown
+        from rich.panel import Panel
 
-    def display_welcome(self):
-        """Display welcome message."""
         welcome_text = f"""
 # 📚 Librarian - Your Book Search Agent
 
@@ -75,8 +151,8 @@ Ask me questions about your books in natural language!
 - "Books about history of Rome"
 
 **Commands:**
-- `/index <path>` - Index a book file or directory (foreground)
-- `/index-bg <path>` - Index a book file or directory in background
+- `/index <path>` - Index a book file or directory
+- `/index-bg <path>` - Index in the background (run before the first search)
 - `/index-status` - Check background indexing status
 - `/check <path>` - Check for new books in a directory
 - `/stats` - Show database statistics
@@ -89,15 +165,23 @@ Ask me questions about your books in natural language!
 - Ctrl+R for reverse history search
 - Full line editing with backspace, delete, etc.
 """
-        console.print(Panel(Markdown(welcome_text), border_style="cyan", padding=(1, 2)))
+        return Panel(Markdown(welcome_text), border_style="cyan", padding=(1, 2))
+
+    def display_welcome(self):
+        """Display welcome message."""
+        # A Panel is immutable once built, so reprinting the cached
+        # instance (startup plus every /help) skips the markdown parse
+        console.print(self._welcome_panel)
 
     def display_results(self, results: list):
         """Display search results in a formatted table."""
+        from rich.table import Table
+
         if not results:
             console.print("\n[yellow]No matching books found.[/yellow]\n")
             return
 
-        # Create a table
+        # Create a table from the cached column skeleton
         table = Table(
             title=f"\n📖 Found {len(results)} matching book(s)",
             title_style="bold green",
@@ -105,22 +189,10 @@ Ask me questions about your books in natural language!
             header_style="bold cyan",
             border_style="blue"
         )
-
-        table.add_column("Title", style="cyan", no_wrap=False, width=25)
-        table.add_column("Author", style="magenta", width=18)
-        table.add_column("Format", style="green", width=8)
-        table.add_column("File", style="blue", no_wrap=False, width=30)
-        table.add_column("Match", style="yellow", width=40)
+        for name, style, width in self._table_columns:
+            table.add_column(name, style=style, width=width, no_wrap=False)
 
         for book in results:
-            # Format relevance score as percentage
-            score = f"{book['relevance_score'] * 100:.1f}%"
-
-            # Truncate best match for display
-            match_text = book.get('best_match', '')
-            if len(match_text) > 120:
-                match_text = match_text[:117] + "..."
-
             # Get filename and create a clickable link using OSC 8
             filename = book.get('filename', 'Unknown')
             # Create hyperlink that opens the file when clicked (if terminal supports it)
@@ -129,9 +201,9 @@ Ask me questions about your books in natural language!
             table.add_row(
                 book['title'],
                 book['author'],
-                book['format'].replace('.', '').upper(),
+                book['format'].lstrip('.').upper(),
                 file_link,
-                match_text
+                _truncate(book.get('best_match', ''))
             )
 
         console.print(table)
@@ -146,84 +218,207 @@ Ask me questions about your books in natural language!
         """
         parts = user_input.strip().split(maxsplit=1)
         command = parts[0].lower()
+        args = parts[1] if len(parts) > 1 else ''
+
+        handler = self._commands.get(command)
+        if handler is None:
+            console.print(f"[red]Unknown command: {command}[/red]")
+            console.print("[yellow]Type /help for available commands[/yellow]")
+            return True
+        return handler(args)
 
-        if command in ['/quit', '/exit']:
-            console.print("\n[cyan]Goodbye! 👋[/cyan]\n")
-            return False
+    def _cmd_quit(self, args: str) -> bool:
+        console.print("\n[cyan]Goodbye! 👋[/cyan]\n")
+        return False
 
-        elif command == '/help':
-            self.display_welcome()
+    def _cmd_help(self, args: str) -> bool:
+        self.display_welcome()
+        return True
 
-        elif command == '/stats':
-            db = self._get_database()
-            stats = db.get_stats()
-            console.print("[bold cyan]📊 Database Statistics:[/bold cyan]")
-            console.print(f"  Total indexed chunks: {stats.get('total_chunks', 0)}")
-            console.print(f"  Collection: {stats.get('collection_name', 'N/A')}\n")
+    def _cmd_stats(self, args: str) -> bool:
+        stats = self.db.get_stats()
+        console.print("[bold cyan]📊 Database Statistics:[/bold cyan]")
+        console.print(f"  Total indexed chunks: {stats.get('total_chunks', 0)}")
+        console.print(f"  Collection: {stats.get('collection_name', 'N/A')}\n")
+        return True
 
-        elif command == '/index':
-            if len(parts) < 2:
-                console.print("[red]Usage: /index <file_or_directory>[/red]")
-            else:
-                path = parts[1].strip()
-                console.print()
-                if Path(path).is_dir():
-                    self.indexer.index_directory(path)
-                else:
-                    self.indexer.index_file(path)
+    def _parse_index_args(self, usage: str, args: str):
+        """
+        Parse '<path> [--batch=N]' arguments shared by the index commands.
 
-        elif command == '/index-bg':
-            if len(parts) < 2:
-                console.print("[red]Usage: /index-bg <file_or_directory>[/red]")
-            else:
-                path = parts[1].strip()
-                if not Path(path).exists():
-                    console.print(f"[red]Error: Path '{path}' does not exist[/red]")
-                elif self.bg_indexer.is_running():
-                    console.print("[yellow]Background indexing is already running![/yellow]")
-                    console.print("[dim]Use /index-status to check progress[/dim]")
-                else:
-                    if self.bg_indexer.start_indexing(path, self.db_path):
-                        console.print(f"[green]✓ Started background indexing: {path}[/green]")
-                        console.print("[dim]Use /index-status to check progress[/dim]")
-                        console.print("[dim]You can continue searching while indexing runs in the background[/dim]\n")
-                    else:
-                        console.print("[red]Failed to start background indexing[/red]")
-
-        elif command == '/check':
-            if len(parts) < 2:
-                console.print("[red]Usage: /check <directory>[/red]")
+        The --batch flag may appear anywhere; the remaining tokens form
+        the path (which may itself contain spaces).
+
+        Args:
+            usage: Usage line to print when the path is missing
+            args: Raw argument string after the command word
+
+        Returns:
+            (path, batch_size) tuple, or None if the arguments were
+            invalid (an error has already been printed)
+        """
+        batch_size = None
+        path_tokens = []
+        for token in args.split():
+            if token.startswith('--batch='):
+                try:
+                    batch_size = int(token[len('--batch='):])
+                    if not 50 <= batch_size <= 250:
+                        raise ValueError
+                except ValueError:
+                    console.print(f"[red]Invalid batch size '{token}': "
+                                  f"expected --batch=N with N in 50-250[/red]")
+                    return None
             else:
-                path = parts[1].strip()
-                self.check_for_new_books(path)
+                path_tokens.append(token)
+        path = ' '.join(path_tokens)
+
+        if not path:
+            console.print(f"[red]{usage}[/red]")
+            return None
+        if not Path(path).exists():
+            console.print(f"[red]Error: Path '{path}' does not exist[/red]")
+            return None
+        return path, batch_size
+
+    def _cmd_index(self, args: str) -> bool:
+        # Index in-process, on this session's shared database. The
+        # session holds the database lock from first use until exit, so
+        # this is the only route that is guaranteed not to block on the
+        # lock - and new books are searchable the moment it returns.
+        parsed = self._parse_index_args(
+            "Usage: /index <file_or_directory> [--batch=N]", args)
+        if parsed is None:
+            return True
+        path, batch_size = parsed
+
+        if self.bg_indexer.is_running():
+            console.print("[yellow]Background indexing is already running![/yellow]")
+            console.print("[dim]Wait for it to finish (/index-status) before indexing here[/dim]")
+            return True
+
+        if batch_size is not None:
+            self.db.set_batch_size(batch_size)
+        if Path(path).is_dir():
+            self.indexer.index_directory(path)
+        else:
+            self.indexer.index_file(path)
+        # Make everything just indexed visible to searches right away
+        self.db.flush()
+        self._invalidate_search_cache()
+        return True
 
-        elif command == '/index-status':
-            self.show_indexing_status()
+    def _cmd_index_bg(self, args: str) -> bool:
+        # Hand the job to the background worker so the prompt stays
+        # responsive. The worker needs the database lock, and each
+        # process keeps it from first database use until exit - so once
+        # this session has opened the database the job could only wedge
+        # at "Initializing indexer...". Refuse up front in that case.
+        parsed = self._parse_index_args(
+            "Usage: /index-bg <file_or_directory> [--batch=N]", args)
+        if parsed is None:
+            return True
+        path, batch_size = parsed
+
+        # Check the process-wide registry, not just our cached_property:
+        # the CLI pre-indexing path in main() opens the shared database
+        # before the chat starts, and that instance holds the lock too
+        from database import database_is_open
+        if database_is_open(self.db_path):
+            console.print("[yellow]This session already holds the database lock "
+                          "(a search or /index has run), so a background worker "
+                          "could not open the database.[/yellow]")
+            console.print("[dim]Use /index instead, or run /index-bg before the first search[/dim]")
+        elif self.bg_indexer.is_running():
+            console.print("[yellow]Background indexing is already running![/yellow]")
+            console.print("[dim]Use /index-status to check progress[/dim]")
+        elif self.bg_indexer.start_indexing(path, self.db_path,
+                                            batch_size=batch_size):
+            console.print(f"[green]✓ Started background indexing: {path}[/green]")
+            console.print("[dim]Use /index-status to check progress[/dim]")
+            console.print("[dim]The first search will wait for the lock until indexing finishes[/dim]\n")
+        else:
+            console.print("[red]Failed to start background indexing[/red]")
+        return True
 
+    def _cmd_check(self, args: str) -> bool:
+        if not args:
+            console.print("[red]Usage: /check <directory>[/red]")
         else:
-            console.print(f"[red]Unknown command: {command}[/red]")
-            console.print("[yellow]Type /help for available commands[/yellow]")
+            self.check_for_new_books(args.strip())
+        return True
 
+    def _cmd_index_status(self, args: str) -> bool:
+        self.show_indexing_status()
         return True
 
     def search(self, query: str, n_results: int = 5):
         """Search for books and display results."""
         console.print(f"\n[dim]Searching for: {query}[/dim]")
 
-        db = self._get_database()
+        db = self.db
 
-        # Check if database is empty (only on first search)
-        if self.db is not None:  # Only check after db is loaded
+        # Check if database is empty; once it's known to hold chunks the
+        # per-search get_stats round-trip is skipped until indexing runs
+        if not self._known_nonempty:
             stats = db.get_stats()
             if stats.get('total_chunks', 0) == 0:
                 console.print("\n[yellow]⚠️  Database is empty. Use /index <path> to add books.[/yellow]\n")
                 return
+            self._known_nonempty = True
+
+        cache_key = (query.strip().lower(), n_results)
+        results = self._query_cache.get(cache_key)
+        if results is None:
+            # Run the search on the pool; the main thread just waits on
+            # the future, so the spinner keeps animating and Ctrl+C
+            # interrupts the wait instead of being deferred
+            with console.status("[bold cyan]Searching...", spinner="dots"):
+                future = self._search_pool.submit(db.search, query, n_results)
+                results = future.result()
 
-        with console.status("[bold cyan]Searching...", spinner="dots"):
-            results = db.search(query, n_results)
+            self._query_cache.put(cache_key, results)
 
         self.display_results(results)
 
+    def search_batch(self, queries: list, n_results: int = 5):
+        """
+        Search several queries at once and display each result set.
+
+        The whole batch is embedded in one model forward and resolved in
+        one dense backend call, so pasting multiple questions costs far
+        less than issuing them one at a time.
+        """
+        queries = [q.strip() for q in queries if q.strip()]
+        if not queries:
+            return
+
+        db = self.db
+        if not self._known_nonempty:
+            stats = db.get_stats()
+            if stats.get('total_chunks', 0) == 0:
+                console.print("\n[yellow]⚠️  Database is empty. Use /index <path> to add books.[/yellow]\n")
+                return
+            self._known_nonempty = True
+
+        with console.status(f"[bold cyan]Searching {len(queries)} queries...",
+                            spinner="dots"):
+            future = self._search_pool.submit(db.search_batch, queries, n_results)
+            all_results = future.result()
+
+        for query, results in zip(queries, all_results):
+            console.print(f"\n[dim]Results for: {query}[/dim]")
+            # Seed the per-query cache so a follow-up single search hits
+            self._query_cache.put((query.lower(), n_results), results)
+            self.display_results(results)
+
+    def _invalidate_search_cache(self):
+        """Drop cached search results after the library has changed."""
+        self._query_cache.clear()
+        # Re-verify emptiness on the next search; indexing may have
+        # added the first books (or a failed run left the DB empty)
+        self._known_nonempty = False
+
     def show_indexing_status(self):
         """Display the status of background indexing."""
         if not self.bg_indexer.is_running():
@@ -231,6 +426,9 @@ Ask me questions about your books in natural language!
             updates = self.bg_indexer.get_all_status_updates()
             if updates:
                 last_update = updates[-1]
+                if last_update.get('status') in ('completed', 'interrupted'):
+                    # Library changed while we weren't looking
+                    self._invalidate_search_cache()
                 if last_update.get('status') == 'completed':
                     stats = last_update.get('stats', {})
                     console.print("[bold green]✓ Background indexing completed![/bold green]")
@@ -272,6 +470,10 @@ Ask me questions about your books in natural language!
             status = update.get('status')
             message = update.get('message', '')
 
+            if status in ('completed', 'interrupted'):
+                # Background indexing (even partial) changed the library
+                self._invalidate_search_cache()
+
             if status == 'completed':
                 stats = update.get('stats', {})
                 console.print("\n[bold green]✓ Background indexing completed![/bold green]")
@@ -303,14 +505,27 @@ Ask me questions about your books in natural language!
 
         new_books = result['new']
         indexed_books = result['indexed']
+        changed_books = result['changed']
         total = result['total']
 
         # Display results
         console.print("\n[bold cyan]📚 Scan Results:[/bold cyan]")
         console.print(f"  Total books found: {total}")
         console.print(f"  Already indexed: {len(indexed_books)}")
+        console.print(f"  Changed since indexing: [bold yellow]{len(changed_books)}[/bold yellow]")
         console.print(f"  New books: [bold green]{len(new_books)}[/bold green]")
 
+        if changed_books:
+            console.print("\n[bold yellow]Changed books (index holds an older version):[/bold yellow]")
+            for i, book in enumerate(changed_books[:10], 1):  # Show first 10
+                console.print(f"  {i}. {book.name}")
+
+            if len(changed_books) > 10:
+                console.print(f"  ... and {len(changed_books) - 10} more")
+
+            console.print("[dim]Re-indexing changed books is not automatic yet; "
+                          "their indexed content is from the older file[/dim]")
+
         if new_books:
             console.print("\n[bold yellow]New books found:[/bold yellow]")
             for i, book in enumerate(new_books[:10], 1):  # Show first 10
@@ -320,75 +535,110 @@ Ask me questions about your books in natural language!
                 console.print(f"  ... and {len(new_books) - 10} more")
 
             console.print(f"\n[dim]Use /index {directory} to index these books[/dim]")
-        else:
+        elif not changed_books:
             console.print("\n[green]✓ All books in this directory are already indexed![/green]")
 
         console.print()
 
     def cleanup(self):
         """Clean up resources before exit."""
-        # Stop background indexing
+        # Always run the background indexer's cleanup: an *idle* worker is
+        # a live non-daemon process too, and without the shutdown sentinel
+        # the interpreter would hang joining it at exit
         if self.bg_indexer.is_running():
             console.print("[yellow]Stopping background indexing...[/yellow]")
-            self.bg_indexer.cleanup()
+        self.bg_indexer.cleanup()
+        self._search_pool.shutdown(wait=False)
+        # Only touch what was actually materialized: a cached_property
+        # lives in __dict__ once resolved, so a plain attribute access
+        # here would construct the db just to close it.
         # Close indexer first (won't close db if it doesn't own it)
-        if self._indexer is not None:
-            self._indexer.close()
+        indexer = self.__dict__.get('indexer')
+        if indexer is not None:
+            indexer.close()
         # Then close the main database
-        if self.db is not None:
-            self.db.close()
+        db = self.__dict__.get('db')
+        if db is not None:
+            db.close()
+
+    async def _poll_bg_updates(self):
+        """Surface background indexing updates while the prompt is open."""
+        while True:
+            await asyncio.sleep(0.5)
+            self.check_background_updates()
+
+    async def _run_async(self):
+        """Async body of the interactive chat interface."""
+        from prompt_toolkit.patch_stdout import patch_stdout
 
-    def run(self):
-        """Run the interactive chat interface."""
         self.display_welcome()
 
         # Note: We skip checking if database is empty on startup to avoid loading
         # the model immediately. The user will get feedback when they try to search.
 
+        # Poll for background indexing updates concurrently with the
+        # prompt, so progress appears as it happens instead of only when
+        # the user presses Enter; patch_stdout keeps those prints from
+        # garbling the input line
+        poller = asyncio.create_task(self._poll_bg_updates())
+
         try:
-            while True:
-                try:
-                    # Check for background indexing updates
-                    self.check_background_updates()
-
-                    # Show background indexing indicator in prompt
-                    prompt_prefix = "You: "
-                    if self.bg_indexer.is_running():
-                        prompt_prefix = "[dim]⏳ Indexing...[/dim] You: "
-
-                    # Get user input with editing capabilities
-                    console.print()  # Add newline before prompt
-                    user_input = self.session.prompt(prompt_prefix, default="")
-
-                    if not user_input.strip():
-                        continue
-
-                    # Handle commands
-                    if user_input.startswith('/'):
-                        should_continue = self.handle_command(user_input)
-                        if not should_continue:
-                            break
-                    else:
-                        # Perform search
-                        self.search(user_input)
-
-                except KeyboardInterrupt:
-                    console.print("\n\n[cyan]Goodbye! 👋[/cyan]\n")
-                    break
-                except EOFError:
-                    console.print("\n\n[cyan]Goodbye! 👋[/cyan]\n")
-                    break
-                except Exception as e:
-                    console.print(f"\n[red]Error: {e}[/red]\n")
+            with patch_stdout():
+                while True:
+                    try:
+                        # Show background indexing indicator in prompt
+                        prompt_prefix = "You: "
+                        if self.bg_indexer.is_running():
+                            prompt_prefix = "[dim]⏳ Indexing...[/dim] You: "
+
+                        # Get user input with editing capabilities
+                        console.print()  # Add newline before prompt
+                        user_input = await self.session.prompt_async(prompt_prefix, default="")
+
+                        if not user_input.strip():
+                            continue
+
+                        # Handle commands
+                        if user_input.startswith('/'):
+                            should_continue = self.handle_command(user_input)
+                            if not should_continue:
+                                break
+                        else:
+                            # Perform search
+                            self.search(user_input)
+
+                    except KeyboardInterrupt:
+                        console.print("\n\n[cyan]Goodbye! 👋[/cyan]\n")
+                        break
+                    except EOFError:
+                        console.print("\n\n[cyan]Goodbye! 👋[/cyan]\n")
+                        break
+                    except Exception as e:
+                        console.print(f"\n[red]Error: {e}[/red]\n")
         finally:
+            poller.cancel()
             # Always cleanup resources
             self.cleanup()
 
+    def run(self):
+        """Run the interactive chat interface."""
+        asyncio.run(self._run_async())
+
 
 def main():
     """Main entry point."""
     global _shutdown_requested
 
+    # Cap the BLAS/OpenMP pools before torch or chromadb load: the
+    # encoder's MKL threads and hnswlib's search threads otherwise each
+    # claim every core and thrash on context switches during indexing.
+    # setdefault keeps any explicit user setting in charge.
+    import os
+    half_cores = str(max(1, (os.cpu_count() or 2) // 2))
+    os.environ.setdefault("OMP_NUM_THREADS", half_cores)
+    os.environ.setdefault("MKL_NUM_THREADS", half_cores)
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
     # Parse command-line arguments
     parser = argparse.ArgumentParser(
         description="Librarian - A natural language book search agent",
@@ -417,6 +667,12 @@ Examples:
         action='store_true',
         help='Check for new books without indexing (requires path argument)'
     )
+    parser.add_argument(
+        '--fast',
+        action='store_true',
+        help='Use the lighter 3-layer encoder (lower CPU latency, slightly '
+             'lower retrieval quality; index and search must both use it)'
+    )
 
     args = parser.parse_args()
 
@@ -443,7 +699,7 @@ Examples:
         console.print(f"[dim]Using database: {args.db_path}[/dim]")
 
         # Create librarian instance just for checking
-        librarian = Librarian(db_path=args.db_path)
+        librarian = Librarian(db_path=args.db_path, fast=args.fast)
         librarian.check_for_new_books(args.path)
         librarian.cleanup()
         return
@@ -451,10 +707,14 @@ Examples:
     # Check if a path was provided for initial indexing
     if args.path:
         # If path provided, index it first then start chat
+        from database import EMBEDDING_MODEL, FAST_EMBEDDING_MODEL, get_database
+        from indexer import BookIndexer
+
         console.print(f"[cyan]Indexing books from: {args.path}[/cyan]")
         console.print(f"[dim]Using database: {args.db_path}[/dim]\n")
 
-        indexer = BookIndexer(args.db_path)
+        model = FAST_EMBEDDING_MODEL if args.fast else EMBEDDING_MODEL
+        indexer = BookIndexer(args.db_path, db=get_database(args.db_path, model_name=model))
         try:
             if Path(args.path).is_dir():
                 indexer.index_directory(args.path, interrupt_check=lambda: _shutdown_requested)
@@ -472,7 +732,7 @@ Examples:
         console.print()
 
     # Start the interactive chat
-    librarian = Librarian(db_path=args.db_path)
+    librarian = Librarian(db_path=args.db_path, fast=args.fast)
     librarian.run()
 
 
@@ -0,0 +1,122 @@
+"""
+Read-ahead helpers to overlap disk I/O with extraction CPU time.
+
+While the CPU is busy parsing one book, the kernel can already be
+pulling the next files into the page cache. On Linux this uses
+posix_fadvise(POSIX_FADV_WILLNEED), which starts asynchronous readahead
+without threads or extra copies; on platforms without fadvise a small
+thread pool touches the files instead.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Sequence
+
+_HAS_FADVISE = hasattr(os, 'posix_fadvise')
+
+# Escape hatch: LIBRARIAN_NO_READAHEAD=1 turns all prefetching off (for
+# spinning disks or memory-constrained boxes where readahead hurts);
+# LIBRARIAN_READAHEAD overrides how many files are kept ahead of the
+# consumer
+_DISABLED = os.environ.get('LIBRARIAN_NO_READAHEAD', '') == '1'
+
+try:
+    READAHEAD_DEPTH = int(os.environ.get('LIBRARIAN_READAHEAD', '32'))
+except ValueError:
+    READAHEAD_DEPTH = 32
+
+# Lazily-created pool for the non-fadvise fallback
+_fallback_pool = None
+
+
+def _touch_file(file_path: str, max_bytes: int = 1024 * 1024):
+    """Read the head of a file to warm the page cache (fallback path)."""
+    try:
+        with open(file_path, 'rb') as f:
+            f.read(max_bytes)
+    except OSError:
+        pass
+
+
+def prefetch(file_path) -> None:
+    """
+    Hint the kernel to start reading a file into the page cache.
+
+    Returns immediately; the readahead proceeds asynchronously.
+    """
+    if _DISABLED:
+        return
+
+    path = str(file_path)
+
+    if _HAS_FADVISE:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+    else:
+        global _fallback_pool
+        if _fallback_pool is None:
+            _fallback_pool = ThreadPoolExecutor(max_workers=4)
+        _fallback_pool.submit(_touch_file, path)
+
+
+def prefetch_many(file_paths: Iterable, limit: int = None) -> None:
+    """
+    Prefetch up to `limit` files.
+
+    Args:
+        file_paths: Paths to prefetch
+        limit: Maximum number of files to submit, to avoid flooding the
+            page cache on very large directories (default READAHEAD_DEPTH)
+    """
+    if limit is None:
+        limit = READAHEAD_DEPTH
+    for i, file_path in enumerate(file_paths):
+        if i >= limit:
+            break
+        prefetch(file_path)
+
+
+def prefetch_window(file_paths: Sequence, position: int,
+                    depth: int = None) -> None:
+    """
+    Keep the page cache `depth` files ahead of a sliding consumer.
+
+    Called with the index of the file about to be consumed; hints the
+    file `depth` positions further on, so a consumer that calls this on
+    every step maintains a constant readahead window with one fadvise
+    per file. No-op past the end of the sequence.
+
+    Args:
+        file_paths: The full ordered list being consumed
+        position: Index of the file being consumed now
+        depth: Window size in files (default READAHEAD_DEPTH)
+    """
+    if depth is None:
+        depth = READAHEAD_DEPTH
+    target = position + depth
+    if 0 <= target < len(file_paths):
+        prefetch(file_paths[target])
+
+
+def drop_cache(file_path) -> None:
+    """
+    Tell the kernel a file's pages are no longer needed.
+
+    Useful after processing large books on cold-cache runs so the walk
+    doesn't evict more useful data. No-op where unsupported.
+    """
+    if not _HAS_FADVISE:
+        return
+    try:
+        fd = os.open(str(file_path), os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
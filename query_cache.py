@@ -0,0 +1,69 @@
+"""
+Thread-safe LRU + TTL cache for search results.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class QueryCache:
+    """
+    Small in-memory cache with LRU eviction and per-entry TTL.
+
+    Used to short-circuit repeated interactive searches: a hit skips the
+    embedding forward pass and the vector-index traversal entirely. All
+    operations take an RLock, so the cache can be shared between the
+    prompt loop and background threads.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 300.0):
+        """
+        Args:
+            max_size: Entries kept before the least recently used is evicted
+            ttl_seconds: Age after which an entry no longer counts as valid
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            timestamp, value = entry
+            if time.monotonic() - timestamp >= self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used past max_size."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry (e.g. after the underlying data changed)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
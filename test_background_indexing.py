@@ -27,23 +27,14 @@ def test_background_indexing():
     print("✓ Background indexing started!")
     print()
 
-    # Monitor status
-    print("Monitoring status (for 15 seconds)...")
-    for i in range(15):
-        time.sleep(1)
-
-        # Check if still running
-        if bg_indexer.is_running():
-            elapsed = bg_indexer.get_elapsed_time()
-            print(f"[{i+1}s] Status: Running (elapsed: {elapsed})")
-
-            # Check for updates
-            updates = bg_indexer.get_all_status_updates()
-            for update in updates:
-                print(f"  → {update.get('status')}: {update.get('message', '')}")
-        else:
-            print(f"[{i+1}s] Status: Completed!")
-            break
+    # Block on the worker's done event instead of polling is_running();
+    # this returns the instant the job finishes (or after 15s)
+    print("Waiting for completion (up to 15 seconds)...")
+    finished = bg_indexer.done.wait(timeout=15)
+    if finished:
+        print(f"✓ Finished after {bg_indexer.get_elapsed_time()}")
+    else:
+        print("✗ Still running after 15 seconds")
 
     print()
 
@@ -99,8 +90,7 @@ def test_concurrent_access():
         print(f"✗ Error accessing database: {e}")
 
     # Wait for background indexing to complete
-    while bg_indexer.is_running():
-        time.sleep(1)
+    bg_indexer.done.wait(timeout=30)
 
     bg_indexer.cleanup()
 
@@ -2,65 +2,88 @@
 """
 Test script to verify database locking with true concurrent access.
 """
-import time
-import sys
+import logging
 import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 from database import BookDatabase
 
+# %-style lazy formatting: nothing is stringified unless the record is
+# actually emitted. Default WARNING keeps the workers quiet; flip to
+# INFO to watch the lock handoff.
+log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.WARNING, format="%(message)s")
+
+# Barrier shared with the workers via the pool initializer; both workers
+# block on it and are released in the same instant, so the lock acquire
+# really races instead of relying on a sleep-staggered start
+_barrier = None
+
+
+def _init_worker(barrier):
+    """Store the shared barrier in the worker process."""
+    global _barrier
+    _barrier = barrier
+
 
 def process_with_lock(process_id: int, hold_time: int):
     """
-    Process that acquires database lock.
+    Worker that acquires the database lock.
 
     Args:
-        process_id: Identifier for this process
+        process_id: Identifier for this worker
         hold_time: How long to hold the lock (seconds)
     """
+    # Both workers hit this together, then race for the lock
+    _barrier.wait()
+
     start = time.time()
-    print(f"[{start:.3f}] Process {process_id}: Starting, attempting to acquire lock...")
+    log.info("[%.3f] Process %d: Attempting to acquire lock...", start, process_id)
 
     db = BookDatabase('./chroma_db', verbose=True)
 
     acquired = time.time()
-    print(f"[{acquired:.3f}] Process {process_id}: Lock acquired after {acquired-start:.2f}s! Holding for {hold_time} seconds...")
+    log.info("[%.3f] Process %d: Lock acquired after %.2fs! Holding for %d seconds...",
+             acquired, process_id, acquired - start, hold_time)
 
     # Simulate work
     for i in range(hold_time):
         time.sleep(1)
-        print(f"[{time.time():.3f}] Process {process_id}: Working... {i+1}/{hold_time}")
+        log.info("[%.3f] Process %d: Working... %d/%d",
+                 time.time(), process_id, i + 1, hold_time)
 
-    print(f"[{time.time():.3f}] Process {process_id}: Releasing lock...")
+    log.info("[%.3f] Process %d: Releasing lock...", time.time(), process_id)
     db.close()
 
     released = time.time()
-    print(f"[{released:.3f}] Process {process_id}: Done! (total time: {released-start:.2f}s)")
+    log.info("[%.3f] Process %d: Done! (total time: %.2fs)",
+             released, process_id, released - start)
+    return released - start
 
 
 def main():
-    """Run two processes concurrently."""
+    """Run two workers that race for the lock simultaneously."""
     print("=" * 70)
     print("Testing concurrent database access with file locking")
     print("=" * 70)
     print()
 
-    # Create two processes that will try to access the database concurrently
-    p1 = multiprocessing.Process(target=process_with_lock, args=(1, 5))
-    p2 = multiprocessing.Process(target=process_with_lock, args=(2, 3))
-
-    # Start both processes at nearly the same time
-    print("Starting both processes concurrently...")
-    p1.start()
-    time.sleep(0.1)  # Small delay to ensure p1 starts first
-    p2.start()
-
-    # Wait for both to complete
-    p1.join()
-    p2.join()
+    # One pool reused for both workers: fork + imports are paid once,
+    # and the barrier guarantees a simultaneous start
+    barrier = multiprocessing.Barrier(2)
+    with ProcessPoolExecutor(max_workers=2, initializer=_init_worker,
+                             initargs=(barrier,)) as executor:
+        print("Submitting both workers; the barrier releases them together...")
+        f1 = executor.submit(process_with_lock, 1, 5)
+        f2 = executor.submit(process_with_lock, 2, 3)
+        f1.result()
+        f2.result()
 
     print()
     print("=" * 70)
     print("✓ Test completed successfully!")
-    print("If process 2 waited for process 1 to release the lock, then the")
+    print("If one worker waited for the other to release the lock, then the")
     print("database lock is working correctly!")
     print("=" * 70)
 
@@ -36,6 +36,9 @@ def test_database():
         console.print("[red]✗ Failed to add book[/red]")
         return False
 
+    # Inserts are buffered; flush so the chunks are searchable
+    db.flush()
+
     # Test search
     console.print("\nTesting search...")
     results = db.search("machine learning algorithms", n_results=1)
@@ -70,13 +73,15 @@ def test_imports():
     console.print("\n[bold cyan]Testing Imports...[/bold cyan]")
 
     modules = [
+        ('blake3', 'BLAKE3'),
         ('chromadb', 'ChromaDB'),
         ('sentence_transformers', 'Sentence Transformers'),
-        ('pypdf', 'PyPDF'),
+        ('pypdfium2', 'pypdfium2'),
         ('ebooklib', 'EbookLib'),
-        ('bs4', 'BeautifulSoup4'),
         ('lxml', 'LXML'),
-        ('rich', 'Rich')
+        ('rank_bm25', 'rank-bm25'),
+        ('rich', 'Rich'),
+        ('prompt_toolkit', 'Prompt Toolkit')
     ]
 
     all_ok = True